@@ -0,0 +1,107 @@
+import argparse
+import numpy as np
+from config_manager import load_settings, update_settings
+from recorder import frame_segments
+
+BANDS = ("FILL_GRAY", "DOT_GRAY", "CRITICAL_GRAY")
+SEARCH_RADIUS = 48 # How far (in gray levels) a band may have shifted from its current value
+MIN_PEAK = 0.002 # Smallest share of pixels a histogram peak needs to count as a band
+MIN_TOLERANCE = 3
+MAX_TOLERANCE = 20
+
+def gray_histogram(frames, chunk=64):
+    """Sum the 256-bin histogram over gray frames, a segment and chunk at a time."""
+    hist = np.zeros(256, dtype=np.int64)
+    for segment in frame_segments(frames):
+        for start in range(0, len(segment), chunk):
+            hist += np.bincount(np.asarray(segment[start:start + chunk]).ravel(), minlength=256)
+    return hist
+
+def smooth(hist, width=3):
+    kernel = np.ones(width) / width
+    return np.convolve(hist, kernel, mode="same")
+
+def find_peaks(hist):
+    """Local maxima of the smoothed, normalized histogram above MIN_PEAK."""
+    h = smooth(hist / max(hist.sum(), 1))
+    left = np.concatenate(([-1.0], h[:-1]))
+    right = np.concatenate((h[1:], [-1.0]))
+    peaks = np.flatnonzero((h >= left) & (h > right) & (h >= MIN_PEAK))
+    return peaks, h
+
+def half_width(h, peak, level=0.25):
+    """Distance from a peak to where the histogram falls below `level` of its height."""
+    floor = h[peak] * level
+    lo = peak
+    while lo > 0 and h[lo - 1] >= floor:
+        lo -= 1
+    hi = peak
+    while hi < 255 and h[hi + 1] >= floor:
+        hi += 1
+    return max(peak - lo, hi - peak)
+
+def calibrate(frames, settings=None):
+    """Pick fill/dot/critical gray centers and a tolerance from frames showing the bar.
+
+    Each band takes the highest histogram peak within SEARCH_RADIUS of its
+    current value, so stray grays around the bar are not mistaken for it.
+    The tolerance covers the widest peak but stays below half the gap
+    between neighbouring bands. Raises ValueError if a band can't be found.
+    """
+    settings = settings or load_settings()
+    hist = gray_histogram(frames)
+    peaks, h = find_peaks(hist)
+    result = {}
+    for key in BANDS:
+        near = peaks[np.abs(peaks - settings[key]) <= SEARCH_RADIUS]
+        if near.size == 0:
+            raise ValueError(f"No histogram peak near {key}={settings[key]}; is the bar visible?")
+        peak = int(near[np.argmax(h[near])])
+        # Smoothing flattens sharp peaks, so take the exact center from the raw histogram
+        lo = max(0, peak - 2)
+        result[key] = lo + int(np.argmax(hist[lo:peak + 3]))
+
+    centers = sorted(result.values())
+    gaps = np.diff(centers)
+    if len(set(centers)) < len(centers):
+        raise ValueError("Two bands resolved to the same gray level")
+    tolerance = max(half_width(h, result[key]) for key in BANDS) + 1
+    tolerance = min(tolerance, int(gaps.min() // 2) - 1, MAX_TOLERANCE)
+    result["TOLERANCE"] = max(tolerance, MIN_TOLERANCE)
+    return result
+
+def capture_burst(roi, duration=0.5, interval=0.01):
+    """Grab gray ROI frames from the screen for `duration` seconds."""
+    import time
+    import cv2
+    from capture import MSSCapture
+
+    frames = []
+    with MSSCapture() as capture:
+        capture.open(roi)
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            frames.append(cv2.cvtColor(capture.grab(), cv2.COLOR_BGRA2GRAY))
+            time.sleep(interval)
+    return np.stack(frames)
+
+def calibrate_recording(path, save=False):
+    """Calibrate from a FrameRecorder file or .npz session, optionally saving the result."""
+    from replay import load_session
+
+    frames, _, _ = load_session(path)
+    result = calibrate(frames)
+    if save:
+        update_settings(result)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive gray targets and tolerance from recorded frames.")
+    parser.add_argument("session", help="frame recording or .npz session showing the mining bar")
+    parser.add_argument("--save", action="store_true", help="write the result to settings.json")
+    args = parser.parse_args()
+    result = calibrate_recording(args.session, save=args.save)
+    print(", ".join(f"{key}={value}" for key, value in result.items()))
+
+if __name__ == "__main__":
+    main()
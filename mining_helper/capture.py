@@ -0,0 +1,308 @@
+import threading
+import time
+import numpy as np
+from clock import SystemClock
+
+class CaptureSource:
+    """Base class for anything that can hand the detector ROI frames.
+
+    A source is opened once per mining session and then polled with grab().
+    Frames are returned as uint8 arrays, either BGRA (h, w, 4), BGR (h, w, 3)
+    or already-gray (h, w). The returned array may be a reused buffer, so
+    callers must not keep it around across grabs. Sources that wait for
+    frames may return None instead when woken by an input event.
+
+    Sources that classify frames themselves set last_ratios (dot, fill,
+    critical) on each grab, and sources that capture ahead of grab() set
+    last_timestamp to when the frame was taken; they are None otherwise.
+    """
+
+    open_early = False # Open when the detector starts rather than on the first press
+
+    def __init__(self):
+        self.roi = None
+        self.is_open = False
+        self.last_ratios = None
+        self.last_timestamp = None
+
+    def open(self, roi):
+        self.roi = dict(roi)
+        self.is_open = True
+
+    def configure(self, settings):
+        """Called with the settings when the detector is built and whenever they change."""
+
+    def arm(self):
+        """Called when a press arms the detector; sources that capture ahead drop older frames."""
+
+    def grab(self):
+        raise NotImplementedError
+
+    def grab_screen(self):
+        """Grab the whole screen as (frame, left, top). Only screen-backed sources support this."""
+        raise NotImplementedError
+
+    def close(self):
+        self.is_open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class MSSCapture(CaptureSource):
+    """Screen capture through a single long-lived mss instance."""
+
+    def __init__(self):
+        super().__init__()
+        self._sct = None
+        self._monitor = None
+        self._shape = None
+
+    def open(self, roi):
+        import mss
+
+        if self.is_open:
+            self.close()
+        super().open(roi)
+        self._sct = mss.mss()
+        self._monitor = {
+            "top": self.roi["y"], "left": self.roi["x"],
+            "width": self.roi["width"], "height": self.roi["height"]
+        }
+        self._shape = (self.roi["height"], self.roi["width"], 4)
+
+    def grab(self):
+        # A view over the BGRA bytes mss hands back, no copy; the caller converts or copies it once
+        sct_img = self._sct.grab(self._monitor)
+        return np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(self._shape)
+
+    def grab_screen(self):
+        import mss
+
+        sct = self._sct if self._sct is not None else mss.mss()
+        try:
+            monitor = sct.monitors[1] if len(sct.monitors) > 1 else sct.monitors[0]
+            sct_img = sct.grab(monitor)
+            frame = np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(sct_img.height, sct_img.width, 4)
+            return frame, monitor["left"], monitor["top"]
+        finally:
+            if sct is not self._sct:
+                sct.close()
+
+    def close(self):
+        if self._sct is not None:
+            self._sct.close()
+        self._sct = None
+        super().close()
+
+class ArrayCapture(CaptureSource):
+    """Plays back a fixed sequence of frames, e.g. synthetic bars in tests.
+
+    Once the sequence runs out the last frame is repeated, or the sequence
+    starts over when loop=True.
+    """
+
+    def __init__(self, frames, loop=False):
+        super().__init__()
+        self.frames = frames
+        self.loop = loop
+        self.index = 0
+
+    def open(self, roi=None):
+        super().open(roi or {"x": 0, "y": 0, "width": self.frames[0].shape[1], "height": self.frames[0].shape[0]})
+        self.index = 0
+
+    def grab(self):
+        if self.index >= len(self.frames):
+            if not self.loop:
+                return self.frames[-1]
+            self.index = 0
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
+
+class SharedCapture:
+    """One screen grab of the bounding box of several ROIs, shared by SliceCaptures.
+
+    A single capture thread grabs the bounding box once per poll interval
+    (the shortest any open slice asks for) and publishes it as the newest
+    frame. Slices hand out views of whatever is newest, so N workers cost
+    one grab per tick however their polls line up, and the thread idles
+    while no slice is open. Frames rotate through BUFFERS buffers, so a view
+    stays valid for BUFFERS - 1 ticks after it was handed out. Slices stay
+    registered between mining cycles, and mss (owned by the capture thread)
+    is only reopened when the bounding box of their ROIs actually changes.
+    """
+
+    BUFFERS = 4
+    FIRST_FRAME_TIMEOUT = 1.0 # Longest a slice waits for a frame newer than its open() that covers it
+
+    def __init__(self, interval=0.01, source=MSSCapture):
+        self.interval = interval # Used for slices that were never configured
+        self.source = source
+        self.slices = []
+        self.region = None
+        self.grabs = 0
+        self.errors = 0
+        self._cond = threading.Condition()
+        self._active = {} # Open slice -> the poll interval it asks for
+        self._latest = None # (frame, region, timestamp) of the newest grab
+        self._thread = None
+        self._stopping = False
+
+    def register(self, slice_capture):
+        """Add a slice, or take note that its ROI changed."""
+        with self._cond:
+            if slice_capture not in self.slices:
+                self.slices.append(slice_capture)
+            self.region = None
+
+    def unregister(self, slice_capture):
+        with self._cond:
+            if slice_capture in self.slices:
+                self.slices.remove(slice_capture)
+            self._active.pop(slice_capture, None)
+            self.region = None
+        if not self.slices:
+            self.close()
+
+    def activate(self, slice_capture, interval):
+        """Have the capture thread grab for an open slice, at least every `interval` seconds."""
+        with self._cond:
+            self._active[slice_capture] = self.interval if interval is None else interval
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="shared-capture", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def deactivate(self, slice_capture):
+        with self._cond:
+            self._active.pop(slice_capture, None)
+
+    def grab(self, roi, since):
+        """Return (frame, left, top, timestamp) of the newest grab taken at or after `since` that covers `roi`."""
+        deadline = time.perf_counter() + self.FIRST_FRAME_TIMEOUT
+        with self._cond:
+            while not self._covers(roi, since):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or self._thread is None or not self._thread.is_alive():
+                    raise RuntimeError("Shared capture produced no frames")
+                self._cond.wait(remaining)
+            frame, region, timestamp = self._latest
+        return frame, region["x"], region["y"], timestamp
+
+    def _covers(self, roi, since):
+        if self._latest is None:
+            return False
+        _, region, timestamp = self._latest
+        return (timestamp >= since
+                and region["x"] <= roi["x"] and roi["x"] + roi["width"] <= region["x"] + region["width"]
+                and region["y"] <= roi["y"] and roi["y"] + roi["height"] <= region["y"] + region["height"])
+
+    def _bounding_box(self):
+        rois = [s.roi for s in self.slices]
+        left = min(r["x"] for r in rois)
+        top = min(r["y"] for r in rois)
+        right = max(r["x"] + r["width"] for r in rois)
+        bottom = max(r["y"] + r["height"] for r in rois)
+        return {"x": left, "y": top, "width": right - left, "height": bottom - top}
+
+    def _run(self):
+        """Capture thread: one grab per tick while any slice is open."""
+        clock = SystemClock()
+        capture = None
+        buffers = []
+        deadline = clock.now()
+        try:
+            while True:
+                with self._cond:
+                    if not self._active and not self._stopping:
+                        while not self._active and not self._stopping:
+                            self._cond.wait()
+                        deadline = clock.now()
+                    if self._stopping:
+                        return
+                    if self.region is None:
+                        self.region = self._bounding_box()
+                    region = self.region
+                    interval = min(self._active.values())
+                try:
+                    if capture is None or region != capture.roi:
+                        if capture is not None:
+                            capture.close()
+                            capture = None
+                        capture = self.source()
+                        capture.open(region)
+                        buffers = [np.empty((region["height"], region["width"], 4), dtype=np.uint8)
+                                   for _ in range(self.BUFFERS)]
+                    frame = capture.grab()
+                except Exception:
+                    self.errors += 1
+                    clock.sleep(max(interval, 0.001))
+                    continue
+                grabbed = clock.now()
+                buffer = buffers[self.grabs % self.BUFFERS]
+                np.copyto(buffer, frame)
+                with self._cond:
+                    self.grabs += 1
+                    self._latest = (buffer, region, grabbed)
+                    self._cond.notify_all()
+                deadline = max(deadline + interval, clock.now())
+                clock.sleep_until(deadline)
+        finally:
+            if capture is not None:
+                capture.close()
+
+    def close(self):
+        """Stop the capture thread and close mss; the next open slice starts them again."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        with self._cond:
+            self._latest = None
+            self.region = None
+
+class SliceCapture(CaptureSource):
+    """A per-ROI zero-copy view into the newest SharedCapture frame."""
+
+    def __init__(self, shared):
+        super().__init__()
+        self.shared = shared
+        self.interval = None
+        self._since = 0.0
+
+    def configure(self, settings):
+        self.interval = settings["POLL_INTERVAL"]
+        if self.is_open:
+            self.shared.activate(self, self.interval)
+
+    def open(self, roi):
+        changed = roi != self.roi
+        super().open(roi)
+        if changed:
+            self.shared.register(self)
+        # The first grab waits for a frame taken after this, not one left over from before the press
+        self._since = time.perf_counter()
+        self.shared.activate(self, self.interval)
+
+    def grab(self):
+        frame, left, top, self.last_timestamp = self.shared.grab(self.roi, self._since)
+        x = self.roi["x"] - left
+        y = self.roi["y"] - top
+        return frame[y:y + self.roi["height"], x:x + self.roi["width"]]
+
+    def close(self):
+        self.shared.deactivate(self)
+        self.last_timestamp = None
+        super().close()
+
+    def detach(self):
+        """Leave the shared grab for good; a plain close() stays registered for the next cycle."""
+        self.close()
+        self.shared.unregister(self)
@@ -0,0 +1,265 @@
+import time
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from capture import CaptureSource
+
+SLOTS = 8 # A frame view stays valid for SLOTS - 1 child frames after grab()
+FIRST_FRAME_TIMEOUT = 5.0 # Spawning the child and importing cv2/mss takes a while
+STALE_AFTER = 0.5 # No new frame for this long triggers a liveness check
+IDLE_AFTER = 0.25 # Child drops to IDLE_POLL_INTERVAL when the parent hasn't read for this long
+
+HEADER = np.dtype([
+    ("latest", "<i8"), # Number of the newest complete frame, 0 before the first one
+    ("stop", "<i8"),
+    ("errors", "<i8"),
+    ("heartbeat", "<f8"), # perf_counter() of the child's last loop iteration
+    ("last_read", "<f8"), # perf_counter() of the parent's last grab()
+    ("grab_ms", "<f8"), # Smoothed child grab and classify times
+    ("classify_ms", "<f8"),
+])
+
+def slot_dtype(height, width):
+    # seq is 2n - 1 while frame n is being written into the slot and 2n once it is complete
+    return np.dtype([
+        ("seq", "<i8"),
+        ("timestamp", "<f8"),
+        ("ratios", "<f8", (3,)),
+        ("frame", np.uint8, (height, width)),
+    ])
+
+def _layout(buf, height, width):
+    header = np.ndarray((), dtype=HEADER, buffer=buf)
+    slots = np.ndarray((SLOTS,), dtype=slot_dtype(height, width), buffer=buf, offset=HEADER.itemsize)
+    return header, slots
+
+def _attach(name):
+    try:
+        # Only the parent owns (and unlinks) the block
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+def capture_worker(name, roi, settings, control):
+    """Child process: grab, convert and classify into the shared ring until told to stop."""
+    import cv2
+    from capture import MSSCapture
+    from classifier import GrayClassifier
+    from clock import SystemClock
+    from projection import effective_stride
+
+    shm = _attach(name)
+    header, slots = _layout(shm.buf, roi["height"], roi["width"])
+    capture = MSSCapture()
+    clock = SystemClock()
+    classifier = GrayClassifier(settings)
+    stride = effective_stride(roi, settings)
+    n = int(header["latest"])
+    try:
+        capture.open(roi)
+        deadline = clock.now()
+        while not header["stop"]:
+            try:
+                settings = control.get_nowait()
+                classifier.rebuild(settings)
+                stride = effective_stride(roi, settings)
+            except queue.Empty:
+                pass
+
+            start = clock.now()
+            header["heartbeat"] = start
+            try:
+                frame = capture.grab()
+            except Exception:
+                header["errors"] += 1
+                clock.sleep(settings["POLL_INTERVAL"])
+                continue
+            grabbed = clock.now()
+
+            n += 1
+            slot = slots[n % SLOTS]
+            slot["seq"] = 2 * n - 1
+            cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY, dst=slot["frame"])
+            gray = slot["frame"]
+            slot["ratios"] = classifier.ratios(gray[::stride, ::stride] if stride > 1 else gray)
+            slot["timestamp"] = grabbed
+            slot["seq"] = 2 * n
+            header["latest"] = n
+            done = clock.now()
+
+            header["grab_ms"] = 0.9 * header["grab_ms"] + 0.1 * (grabbed - start) * 1000
+            header["classify_ms"] = 0.9 * header["classify_ms"] + 0.1 * (done - grabbed) * 1000
+
+            idle = done - header["last_read"] > IDLE_AFTER
+            interval = max(settings["IDLE_POLL_INTERVAL"], settings["POLL_INTERVAL"]) if idle else settings["POLL_INTERVAL"]
+            deadline = max(deadline + interval, done)
+            clock.sleep_until(deadline)
+    finally:
+        capture.close()
+        del header, slots
+        try:
+            shm.close()
+        except BufferError:
+            pass # A slot view is still referenced; the mapping goes away with the process
+
+class ProcessCapture(CaptureSource):
+    """Capture and classification in a child process, handed over through shared memory.
+
+    The child writes gray frames and their dot/fill/critical ratios into a
+    ring of SLOTS slots guarded by per-slot sequence numbers (a seqlock);
+    grab() returns a view of the newest complete slot without copying and
+    sets last_ratios/last_timestamp for the detector. Keeping mss, cv2 and
+    the classification out of this interpreter means Qt repaints and input
+    listeners can't stall them through the GIL. While grab() waits for the
+    child it checks `wake` (the detector's input event) every millisecond
+    and returns None once it is set, so a release or stop isn't held up.
+    """
+
+    open_early = True
+
+    def __init__(self, settings, wake=None):
+        super().__init__()
+        self.settings = settings
+        self.wake = wake
+        self.process = None
+        self.control = None
+        self._shm = None
+        self._header = None
+        self._slots = None
+        self._seq = self._stamps = self._ratios = self._frames = None
+        self._seen = 0
+        self._seen_at = 0.0
+        self._armed_at = 0.0
+        self._health_at = None
+        self._health_frames = 0
+
+    def open(self, roi):
+        if self.is_open:
+            self.close()
+        super().open(roi)
+        height, width = self.roi["height"], self.roi["width"]
+        self._shm = shared_memory.SharedMemory(create=True, size=HEADER.itemsize + SLOTS * slot_dtype(height, width).itemsize)
+        self._header, self._slots = _layout(self._shm.buf, height, width)
+        # Per-field views so grab() indexes plain arrays instead of structured records
+        self._seq = self._slots["seq"]
+        self._stamps = self._slots["timestamp"]
+        self._ratios = self._slots["ratios"]
+        self._frames = self._slots["frame"]
+        for field in HEADER.names:
+            self._header[field] = 0
+        self._slots["seq"] = 0
+        self._header["last_read"] = time.perf_counter()
+        context = mp.get_context("spawn")
+        self.control = context.Queue()
+        self.process = context.Process(
+            target=capture_worker, args=(self._shm.name, self.roi, self.settings, self.control),
+            name="capture", daemon=True,
+        )
+        self.process.start()
+        self._seen = 0
+        self._seen_at = time.perf_counter()
+        self._armed_at = 0.0
+        self._health_at = None
+
+    def configure(self, settings):
+        self.settings = settings
+        if self.control is not None:
+            self.control.put(settings)
+
+    def arm(self):
+        # Wake the child out of its idle rate now, and don't hand out frames it grabbed while idling
+        if self._header is None:
+            return
+        self._armed_at = time.perf_counter()
+        self._header["last_read"] = self._armed_at
+
+    def grab(self):
+        header = self._header
+        now = time.perf_counter()
+        header["last_read"] = now
+        while True:
+            n = int(header["latest"])
+            if n == 0:
+                if now - self._seen_at > FIRST_FRAME_TIMEOUT or not self.process.is_alive():
+                    raise RuntimeError("Capture process produced no frames")
+                if not self._pause():
+                    return None
+                now = time.perf_counter()
+                continue
+            index = n % SLOTS
+            ratios = tuple(self._ratios[index].tolist())
+            timestamp = float(self._stamps[index])
+            # The child lapped the ring while we read; the newer frame is a better answer anyway
+            if self._seq[index] != 2 * n:
+                continue
+            if timestamp < self._armed_at and now - self._armed_at < STALE_AFTER:
+                # Grabbed before the press; the child delivers a fresh one within an idle poll
+                if not self._pause():
+                    return None
+                now = time.perf_counter()
+                continue
+            break
+
+        if n != self._seen:
+            self._seen, self._seen_at = n, now
+        elif now - self._seen_at > STALE_AFTER and not self.process.is_alive():
+            raise RuntimeError(f"Capture process exited (code {self.process.exitcode})")
+        self.last_ratios = ratios
+        self.last_timestamp = timestamp
+        return self._frames[index]
+
+    def _pause(self):
+        """Give the child a millisecond. Returns False without sleeping once `wake` is set."""
+        if self.wake is not None and self.wake.is_set():
+            return False
+        time.sleep(0.001)
+        return True
+
+    def health(self):
+        """Child liveness, frame rate and timings for display. None when not running."""
+        if self.process is None or self._header is None:
+            return None
+        header = self._header
+        now = time.perf_counter()
+        frames = int(header["latest"])
+        fps = 0.0
+        if self._health_at is not None and now > self._health_at:
+            fps = (frames - self._health_frames) / (now - self._health_at)
+        self._health_at, self._health_frames = now, frames
+        newest = float(self._stamps[frames % SLOTS]) if frames else None
+        return {
+            "alive": self.process.is_alive(),
+            "pid": self.process.pid,
+            "frames": frames,
+            "fps": fps,
+            "frame_age_ms": (now - newest) * 1000 if newest is not None else None,
+            "heartbeat_age_ms": (now - float(header["heartbeat"])) * 1000 if header["heartbeat"] else None,
+            "grab_ms": float(header["grab_ms"]),
+            "classify_ms": float(header["classify_ms"]),
+            "errors": int(header["errors"]),
+        }
+
+    def close(self):
+        if self.process is not None:
+            self._header["stop"] = 1
+            self.process.join(timeout=1.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+        if self.control is not None:
+            self.control.close()
+            self.control = None
+        if self._shm is not None:
+            self._header = self._slots = None
+            self._seq = self._stamps = self._ratios = self._frames = None
+            try:
+                self._shm.close()
+            except BufferError:
+                pass # The detector still holds a frame view; the mapping is freed with it
+            self._shm.unlink()
+            self._shm = None
+        self.last_ratios = None
+        self.last_timestamp = None
+        super().close()
@@ -0,0 +1,61 @@
+import numpy as np
+
+class GrayClassifier:
+    """Counts dot, fill and critical pixels of a gray ROI in a single pass.
+
+    A 256-bin histogram of the frame is taken once and multiplied by a
+    precomputed (3, 256) band table built from the gray targets and the
+    tolerance, so there is no per-band mask over the whole ROI.
+    """
+
+    BANDS = ("DOT_GRAY", "FILL_GRAY", "CRITICAL_GRAY")
+
+    def __init__(self, settings):
+        self.rebuild(settings)
+
+    def rebuild(self, settings):
+        tolerance = settings["TOLERANCE"]
+        levels = np.arange(256)
+        self.table = np.zeros((len(self.BANDS), 256), dtype=np.intp)
+        for i, key in enumerate(self.BANDS):
+            target = settings[key]
+            self.table[i] = (levels >= target - tolerance) & (levels <= target + tolerance)
+        self._counts = np.zeros(len(self.BANDS), dtype=np.intp)
+        self.dot_lut = self.table[0].astype(bool)
+        self.crit_lut = self.table[2].astype(bool)
+        self._mask = None
+        self.dot_width = 0
+
+    def counts(self, gray):
+        hist = np.bincount(gray.ravel(), minlength=256)
+        return np.dot(self.table, hist, out=self._counts)
+
+    def ratios(self, gray):
+        """Return (dot_ratio, fill_ratio, crit_ratio) for a gray frame."""
+        dot, fill, crit = self.counts(gray)
+        size = gray.size
+        return dot / size, fill / size, crit / size
+
+    def locate(self, gray, stride=1):
+        """Find the dot center and critical-zone extent as column positions.
+
+        A column belongs to the dot or zone when at least half of its rows
+        match. Returns (dot_x, zone) where dot_x is a float or None and zone
+        is a (first, last) column pair or None. Positions are multiplied by
+        `stride` so subsampled frames still report full-resolution columns.
+        The width of the located dot, in the same columns, is kept in
+        `dot_width` (0 when there is no dot).
+        """
+        if self._mask is None or self._mask.shape != gray.shape:
+            self._mask = np.empty(gray.shape, dtype=bool)
+        min_rows = max(1, gray.shape[0] // 2)
+
+        np.take(self.dot_lut, gray, out=self._mask)
+        dot_cols = np.flatnonzero(np.count_nonzero(self._mask, axis=0) >= min_rows)
+        dot_x = float(dot_cols.mean()) * stride if dot_cols.size else None
+        self.dot_width = dot_cols.size * stride
+
+        np.take(self.crit_lut, gray, out=self._mask)
+        crit_cols = np.flatnonzero(np.count_nonzero(self._mask, axis=0) >= min_rows)
+        zone = (int(crit_cols[0]) * stride, int(crit_cols[-1]) * stride) if crit_cols.size else None
+        return dot_x, zone
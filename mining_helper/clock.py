@@ -0,0 +1,54 @@
+import time
+
+# Event.wait can overshoot by a full timer tick (~15.6 ms on Windows), so it is
+# only used for the coarse part of a wait. The rest is slept in short slices
+# and the last SPIN_THRESHOLD seconds are spun on perf_counter.
+COARSE_MARGIN = 0.016
+SLICE = 0.002
+SPIN_THRESHOLD = 0.001
+
+class SystemClock:
+    """Wall clock used while actually mining."""
+
+    def now(self):
+        return time.perf_counter()
+
+    def sleep(self, seconds, wake=None):
+        """Sleep for `seconds`, returning early if the `wake` event gets set."""
+        if seconds > 0:
+            self.sleep_until(time.perf_counter() + seconds, wake)
+
+    def sleep_until(self, deadline, wake=None):
+        """Hybrid sleep/spin until `deadline`. Returns False if woken early by `wake`."""
+        remaining = deadline - time.perf_counter()
+        if wake is not None and remaining > COARSE_MARGIN:
+            if wake.wait(remaining - COARSE_MARGIN):
+                return False
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= SPIN_THRESHOLD:
+                break
+            time.sleep(min(SLICE, remaining - SPIN_THRESHOLD))
+            if wake is not None and wake.is_set():
+                return False
+        while time.perf_counter() < deadline:
+            if wake is not None and wake.is_set():
+                return False
+        return True
+
+class VirtualClock:
+    """Clock that only moves when slept on, so replays run as fast as the CPU allows."""
+
+    def __init__(self, start=0.0):
+        self.time = start
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds, wake=None):
+        if seconds > 0:
+            self.time += seconds
+
+    def sleep_until(self, deadline, wake=None):
+        self.time = max(self.time, deadline)
+        return True
@@ -1,26 +1,136 @@
 import os
 import json
+import time
+import tempfile
+import threading
 from constants import DEFAULT_SETTINGS
 
 SETTINGS_PATH = os.path.join(os.path.dirname(__file__), "settings.json")
+WATCH_INTERVAL = 0.5
 
-def load_settings():
+# Process-wide cache; settings.json is only read again when its mtime changes
+_lock = threading.RLock()
+_cache = None
+_mtime = None
+_subscribers = []
+_watcher = None
+
+def _coerce(settings):
+    """Merge with defaults and cast every value to the type of its default."""
+    typed = {}
+    for key, default in DEFAULT_SETTINGS.items():
+        value = settings.get(key, default)
+        try:
+            if isinstance(default, bool):
+                value = value if isinstance(value, bool) else str(value).lower() in ("1", "true", "yes")
+            elif isinstance(default, int):
+                value = int(value)
+            elif isinstance(default, float):
+                value = float(value)
+            else:
+                value = str(value)
+        except (TypeError, ValueError):
+            value = default
+        typed[key] = value
+    return typed
+
+def _file_mtime():
+    try:
+        return os.stat(SETTINGS_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+def _read_settings():
     if not os.path.exists(SETTINGS_PATH):
         return DEFAULT_SETTINGS.copy()
     try:
         with open(SETTINGS_PATH, "r") as f:
             user_settings = json.load(f)
-        # Merge with defaults in case of missing keys
-        return {**DEFAULT_SETTINGS, **user_settings}
+        return _coerce(user_settings)
     except Exception:
         return DEFAULT_SETTINGS.copy()
 
+def load_settings():
+    """Return a copy of the cached settings, reading settings.json on first use."""
+    global _cache, _mtime
+    with _lock:
+        if _cache is None:
+            _mtime = _file_mtime()
+            _cache = _read_settings()
+        return dict(_cache)
+
 def update_settings(new_settings):
-    save_settings({**load_settings(), **new_settings})
+    """Merge new_settings into the current settings and save them."""
+    # Read and write under one lock so a reload by the watcher can't slip in between
+    with _lock:
+        settings = _write({**load_settings(), **new_settings})
+    _notify(settings)
 
 def save_settings(new_settings):
-    with open(SETTINGS_PATH, "w") as f:
-        json.dump(new_settings, f, indent=4)
+    """Write settings atomically (temp file + rename), refresh the cache and notify subscribers."""
+    with _lock:
+        settings = _write(new_settings)
+    _notify(settings)
+
+def _write(new_settings):
+    global _cache, _mtime
+    settings = _coerce(new_settings)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(SETTINGS_PATH), prefix=".settings-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(settings, f, indent=4)
+        os.replace(tmp_path, SETTINGS_PATH)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _cache = settings
+    _mtime = _file_mtime()
+    return settings
 
 def reset_settings():
     save_settings(DEFAULT_SETTINGS.copy())
+
+def subscribe(callback):
+    """Call callback(settings) with a fresh copy whenever the settings change."""
+    with _lock:
+        _subscribers.append(callback)
+
+def unsubscribe(callback):
+    with _lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+def _notify(settings):
+    with _lock:
+        callbacks = list(_subscribers)
+    for callback in callbacks:
+        callback(dict(settings))
+
+def check_for_changes():
+    """Reload settings.json if it was edited outside this process. Returns True on reload."""
+    global _cache, _mtime
+    with _lock:
+        mtime = _file_mtime()
+        if _cache is not None and mtime == _mtime:
+            return False
+        _mtime = mtime
+        _cache = _read_settings()
+        settings = dict(_cache)
+    _notify(settings)
+    return True
+
+def start_watcher(interval=WATCH_INTERVAL):
+    """Poll settings.json's mtime on a daemon thread so outside edits are picked up."""
+    global _watcher
+    if _watcher is not None:
+        return
+    load_settings()
+
+    def watch():
+        while True:
+            time.sleep(interval)
+            check_for_changes()
+
+    _watcher = threading.Thread(target=watch, daemon=True)
+    _watcher.start()
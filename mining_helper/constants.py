@@ -1,12 +1,28 @@
 DEFAULT_SETTINGS = {
     "DEFAULT_DELAY": 0.08, # Initial delay before starting the mining process
     "POLL_INTERVAL": 0.01, # How often we check the ROI for changes, decresase if dot passes the critical zone constantly
+    "ADAPTIVE_POLL": True, # Stretch the poll period to what the PC can actually sustain instead of constantly missing POLL_INTERVAL deadlines
+    "PHASE_POLLING": False, # Poll slowly (IDLE_POLL_INTERVAL) while the dot is far from the critical zone and speed up to POLL_INTERVAL as it gets close, saving CPU for the game
+    "IDLE_POLL_INTERVAL": 0.05, # Slowest poll interval used by PHASE_POLLING
     "RESET_TIMEOUT": 3.0, # Timeout for re-engaging the mining process if no critical zone is detected
-    "RECHECK_GRACE_PERIOD": 0.02, # Time to wait after re-engaging before checking for critical zone again. Do not set this too high, set lower and increase attempts if re-engagement takes too long (shouldn't!).
-    "MAX_REENGAGE_ATTEMPTS": 5, # Maximum attempts to re-engage mining after a critical zone is detected
+    "RECHECK_GRACE_PERIOD": 0.02, # In continuous mode, wait this long after a release before pressing for the next ore; a bar still on screen after the press only counts as the next one after this long again
+    "REENGAGE_TIMEOUT": 0.5, # How long continuous mode watches for the next bar after pressing before giving up
     "DOT_GRAY": 146, # Gray value for the dot in the ROI, don't change
     "FILL_GRAY": 37, # Gray value for the fill in the ROI, don't change
     "CRITICAL_GRAY": 228, # Gray value for the critical zone in the ROI, don't change
     "TOLERANCE": 5, # Tolerance for gray value matching, increase if you have issues with gray values not matching correctly, might increase false positives if you change for some reason. Shouldn't need to be changed.
+    "RELEASE_MODE": "peak_drop", # Release strategy: "peak_drop" (critical zone coverage drops), "zone_entry" (dot center enters the zone), "zone_center" (dot center reaches the zone center) or "velocity_compensated" (tracks the dot and releases early at the predicted zone-center crossing). A profile's own "strategy" overrides it
+    "GATE_RATIO": 0.01, # peak_drop only counts drops while the dot and fill cover more than this share of the ROI; continuous mode also uses it to spot the next bar
+    "DROP_THRESHOLD": 0.005, # Drop in critical zone coverage from its peak that triggers a peak_drop release
+    "MIN_PEAK": 0.01, # Critical zone coverage the peak must exceed before a drop counts
+    "INPUT_LATENCY": 0.0, # Seconds between sending the release and the game seeing it, subtracted from predicted release times
+    "ROW_SAMPLES": 0, # Only capture and analyze this many rows of the ROI (picked automatically when the ROI is saved), 0 uses the full ROI. Cuts work a lot on large/HiDPI ROIs
+    "SAMPLE_STRIDE": 1, # Only look at every Nth row and column of the ROI. Useful on 4K/HiDPI screens, 1 uses every pixel
+    "PIXEL_BUDGET": 0, # Raise the stride automatically until a frame has at most this many pixels, 0 to disable
+    "CAPTURE_PROCESS": False, # Grab and classify frames in a separate process so the GUI can't stall them
+    "SKIP_UNCHANGED": True, # Skip conversion and classification when a sparse sample of the frame matches the previous one
+    "AUTO_LOCATE": False, # Search the whole screen for the mining bar and update the ROI when re-engaging can't find it
+    "STATS_INTERVAL": 5.0, # How often (in seconds) frame timing stats are printed to the log while mining, 0 to disable
+    "LOG_LEVEL": "INFO", # Lowest log level shown in the console; DEBUG adds per-frame ratio lines
     "KEYBIND": "None"
 }
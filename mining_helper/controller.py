@@ -1,17 +1,10 @@
-from pynput import mouse, keyboard
+import threading
 from config_manager import load_settings, update_settings
 
-mouse_controller = mouse.Controller()
-keyboard_controller = keyboard.Controller()
-
-def release_left_click():
-    """Simulate left mouse button release."""
-    mouse_controller.release(mouse.Button.left)
-
-"""
-PRETTY MUCH UNUSED NOW, BUT LEFT HERE BECAUSE IT MIGHT BE USEFUL LATER
-ALL IT DOES IS RELEASE THE LEFT MOUSE BUTTON LOL
-"""
+# pynput is imported and its listeners started on first use, not at import time
+mouse_listener = None
+keyboard_listener = None
+_listener_lock = threading.Lock()
 
 remap_active = False
 on_remap_complete = lambda: 0
@@ -57,8 +50,14 @@ def enable_remap():
 def get_keybind():
     return keybind
 
-mouse_listener = mouse.Listener(on_click=on_mouse_click)
-keyboard_listener = keyboard.Listener(on_press=on_keyboard_press)
-
-mouse_listener.start()
-keyboard_listener.start()
\ No newline at end of file
+def start_listeners():
+    """Start the global keybind listeners. Does nothing if they are already running."""
+    global mouse_listener, keyboard_listener
+    with _listener_lock:
+        if mouse_listener is not None:
+            return
+        from pynput import mouse, keyboard
+        mouse_listener = mouse.Listener(on_click=on_mouse_click)
+        keyboard_listener = keyboard.Listener(on_press=on_keyboard_press)
+        mouse_listener.start()
+        keyboard_listener.start()
\ No newline at end of file
@@ -0,0 +1,131 @@
+import json
+from collections import deque
+import numpy as np
+
+CAPACITY = 50 # Cycles kept in the ring
+SUMMARY_WINDOW = 20 # Cycles the rolling summary line covers
+MAX_FRAMES = 4096 # Frames traced per cycle; later frames are counted but not stored
+
+# One row per classified frame; t is seconds since the cycle started, dot_x is NaN when not located
+TRACE = np.dtype([("t", "<f4"), ("dot", "<f4"), ("fill", "<f4"), ("crit", "<f4"), ("dot_x", "<f4")])
+
+def widest_zone(a, b):
+    """The wider of two (first, last) zones, either of which may be None."""
+    if a is None or b is None:
+        return a or b
+    return a if a[1] - a[0] >= b[1] - b[0] else b
+
+class CycleHistory:
+    """Per-frame traces and outcomes of the most recent mining cycles.
+
+    begin() starts a cycle, frame() appends to a preallocated trace buffer,
+    released()/timed_out() set the outcome and end() files the cycle into a
+    fixed-size ring with its trimmed trace. The release offset is the dot
+    center relative to the critical-zone center at the moment of release,
+    in columns; a release with any part of the dot over the zone counts as
+    a hit, which is where every release strategy aims.
+    Cycles started by continuous re-engagement also carry the dead time since
+    the previous release, from which the ore rate is estimated.
+    """
+
+    def __init__(self, capacity=CAPACITY, max_frames=MAX_FRAMES):
+        self.cycles = deque(maxlen=capacity)
+        self._trace = np.empty(max_frames, dtype=TRACE)
+        self._frames = 0
+        self._start = None
+        self._current = None
+
+    def begin(self, start, dead_time=None):
+        self._start = start
+        self._frames = 0
+        self._current = {
+            "start": start, "outcome": "let_go", "frames": 0, "time_to_trigger": None, "dead_time": dead_time,
+            "offset_px": None, "offset": None, "hit": None, "zone": None, "dot_width": None, "peak_crit": 0.0,
+        }
+
+    def frame(self, timestamp, dot, fill, crit, dot_x=None):
+        i = self._frames
+        if i < len(self._trace):
+            self._trace[i] = (timestamp - self._start, dot, fill, crit, np.nan if dot_x is None else dot_x)
+        self._frames = i + 1
+
+    def see_zone(self, zone):
+        """Remember the widest critical zone seen; the dot hides part of it while passing over."""
+        if self._current is not None:
+            self._current["zone"] = widest_zone(self._current["zone"], zone)
+
+    def released(self, timestamp, dot_x, zone, dot_width=0):
+        cycle = self._current
+        cycle["outcome"] = "released"
+        cycle["time_to_trigger"] = timestamp - self._start
+        zone = widest_zone(cycle["zone"], zone)
+        cycle["zone"] = zone
+        if dot_x is None or zone is None:
+            return
+        center = (zone[0] + zone[1]) / 2
+        half_width = max((zone[1] - zone[0] + 1) / 2, 0.5)
+        cycle["dot_width"] = dot_width
+        cycle["offset_px"] = dot_x - center
+        cycle["offset"] = cycle["offset_px"] / half_width
+        cycle["hit"] = zone[0] - dot_width / 2 <= dot_x <= zone[1] + dot_width / 2
+
+    def timed_out(self):
+        self._current["outcome"] = "timeout"
+
+    def end(self):
+        cycle, self._current = self._current, None
+        stored = min(self._frames, len(self._trace))
+        cycle["frames"] = self._frames
+        cycle["peak_crit"] = float(self._trace["crit"][:stored].max()) if stored else 0.0
+        cycle["trace"] = self._trace[:stored].copy()
+        self.cycles.append(cycle)
+        return cycle
+
+    def summary(self, last=SUMMARY_WINDOW):
+        """Aggregate outcome of the last `last` cycles (all kept cycles if None)."""
+        cycles = list(self.cycles)[-last:] if last else list(self.cycles)
+        released = [c for c in cycles if c["outcome"] == "released"]
+        judged = [c for c in released if c["hit"] is not None]
+        offsets = np.array([c["offset_px"] for c in judged], dtype=np.float64)
+        chained = [c for c in released if c["dead_time"] is not None]
+        dead_time = float(np.mean([c["dead_time"] for c in chained])) if chained else None
+        period = float(np.mean([c["dead_time"] + c["time_to_trigger"] for c in chained])) if chained else None
+        return {
+            "cycles": len(cycles),
+            "released": len(released),
+            "timeouts": sum(c["outcome"] == "timeout" for c in cycles),
+            "hits": sum(c["hit"] for c in judged),
+            "judged": len(judged),
+            "hit_rate": sum(c["hit"] for c in judged) / len(judged) if judged else None,
+            "mean_offset_px": float(offsets.mean()) if offsets.size else None,
+            "mean_abs_offset_px": float(np.abs(offsets).mean()) if offsets.size else None,
+            "mean_time_to_trigger": float(np.mean([c["time_to_trigger"] for c in released])) if released else None,
+            "mean_dead_time": dead_time,
+            "ores_per_minute": 60 / period if period else None,
+        }
+
+    def format_summary(self, last=SUMMARY_WINDOW):
+        s = self.summary(last)
+        parts = [f"[STATS] Last {s['cycles']} cycles:"]
+        if s["judged"]:
+            parts.append(f"{s['hits']}/{s['judged']} hits ({s['hit_rate']:.0%}),")
+            parts.append(f"release offset {s['mean_offset_px']:+.1f} px (mean |{s['mean_abs_offset_px']:.1f}| px),")
+        if s["mean_time_to_trigger"] is not None:
+            parts.append(f"trigger after {s['mean_time_to_trigger']:.2f} s,")
+        if s["mean_dead_time"] is not None:
+            parts.append(f"{s['mean_dead_time'] * 1000:.0f} ms between ores ({s['ores_per_minute']:.1f} ores/min),")
+        parts.append(f"{s['timeouts']} timeouts")
+        return " ".join(parts)
+
+    def export(self, path):
+        """Write outcomes and traces of the kept cycles as JSON."""
+        cycles = []
+        for cycle in self.cycles:
+            trace = cycle["trace"]
+            cycles.append({
+                **{k: v for k, v in cycle.items() if k != "trace"},
+                "hit": None if cycle["hit"] is None else bool(cycle["hit"]),
+                "trace": {name: np.where(np.isnan(trace[name]), None, trace[name].round(5)).tolist() for name in TRACE.names},
+            })
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(None), "cycles": cycles}, f, indent=4)
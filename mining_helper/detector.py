@@ -1,162 +1,556 @@
 import time
-import json
+import queue
 import threading
 import numpy as np
-import mss
 import cv2
-import pyautogui
-from pynput import mouse
-from controller import release_left_click
-from config_manager import load_settings
+from config_manager import load_settings, subscribe, unsubscribe
+from capture import MSSCapture
+from clock import SystemClock
+from scheduler import PollScheduler
+from input_backend import SystemInput
+from classifier import GrayClassifier
+from strategies import make_strategy
+from projection import band_roi, effective_stride, sampled_pixels
+from locator import locate_bar
+from profiles import DEFAULT_PROFILE, DEFAULT_ROI, load_profile, update_profile
+from stats import LatencyStats
+from frame_change import ChangeDetector
+from cycle_history import CycleHistory
+from recorder import FrameRecorder
 
-ROI_CONFIG = "roi_config.json"
+# Worker states
+IDLE = "idle"
+ARMING = "arming"
+POLLING = "polling"
+RELEASED = "released"
+REENGAGING = "re-engaging"
+
+# Settings the capture region and sampling stride are derived from
+SAMPLING_KEYS = ("ROW_SAMPLES", "SAMPLE_STRIDE", "PIXEL_BUDGET")
+
+# Input events fed to the worker
+PRESS = "press"
+RELEASE = "release"
+STOP = "stop"
 
 class Detector:
-    def __init__(self, log_func=print, continuous=False):
+    def __init__(self, log_func=print, continuous=False, capture=None, clock=None,
+                 input_backend=None, roi=None, listen=True, profile=None, settings=None):
         self.log = log_func
+        self.profile = profile
         self.continuous = continuous
         self.running = False
-        self.settings = load_settings()
+        # Replays and tests pass their own settings so they never read settings.json
+        self.settings = dict(settings) if settings is not None else load_settings()
+        self._pending_settings = None
+        self._resample = False # Sampling settings changed mid-cycle; the capture restarts once the cycle is over
+        # Checked before formatting per-frame lines so they cost nothing unless enabled
+        self.debug = self.settings["LOG_LEVEL"] == "DEBUG"
 
         self.mouse_pressed = False
         self.stop_requested = False
-        self.mining_thread_active = False
+        self.state = IDLE
+
+        # Listener callbacks only enqueue events; the worker owns all state
+        self.events = queue.SimpleQueue()
+        self.wake = threading.Event()
+
+        # One capture backend for the whole session instead of one per frame
+        if capture is None:
+            if self.settings["CAPTURE_PROCESS"]:
+                from capture_process import ProcessCapture
+                capture = ProcessCapture(self.settings, wake=self.wake)
+            else:
+                capture = MSSCapture()
+        self.capture = capture
+        self.capture.configure(self.settings)
+        self._gray = None
+        self._kept = None
+        self.stride = 1
+        self.classifier = GrayClassifier(self.settings)
+        self.strategy = None
+        self.change = ChangeDetector()
+        self.stats = LatencyStats()
+        self.history = CycleHistory()
+        self._last_gray = None
+        self._last_frame_time = None
+        self._released_at = None
+        self.dead_time = None
+        self.clock = clock if clock is not None else SystemClock()
+        self.input = input_backend if input_backend is not None else SystemInput()
+        self.recorder = None
 
+        self.listener = None
+        if listen:
+            self.start_listener()
+        if roi is not None:
+            self.roi = dict(roi)
+        else:
+            self.load_roi()
+
+    def start_listener(self):
+        from pynput import mouse
+        self._left_button = mouse.Button.left
         self.listener = mouse.Listener(on_click=self.on_click)
         self.listener.start()
-        self.load_roi()
 
     def load_roi(self):
         try:
-            with open(ROI_CONFIG, 'r') as f:
-                self.roi = json.load(f)
+            self.roi = load_profile(self.profile)
         except Exception as e:
             self.log(f"[ERROR] Failed to load ROI config: {e}")
-            self.roi = {"x": 500, "y": 500, "width": 200, "height": 50}
+            self.roi = dict(DEFAULT_ROI)
 
     def on_click(self, x, y, button, pressed):
-        if button == mouse.Button.left:
-            self.mouse_pressed = pressed
-            if pressed and not self.mining_thread_active:
-                threading.Thread(target=self.handle_mouse_hold, daemon=True).start()
+        if button == self._left_button:
+            self.post(PRESS if pressed else RELEASE)
 
-    def handle_mouse_hold(self):
-        if self.mining_thread_active or not self.mouse_pressed:
-            return
-        self.mining_thread_active = True
+    def post(self, event):
+        self.events.put(event)
+        self.wake.set()
 
-        time.sleep(self.settings["DEFAULT_DELAY"])
-        if not self.mouse_pressed or self.stop_requested:
-            self.mining_thread_active = False
+    def handle_event(self, event):
+        if event == STOP:
+            self.stop_requested = True
+        else:
+            self.mouse_pressed = event == PRESS
+
+    def drain_events(self):
+        self.wake.clear()
+        while True:
+            try:
+                self.handle_event(self.events.get_nowait())
+            except queue.Empty:
+                return
+
+    def wait(self, seconds):
+        """Sleep up to `seconds`, waking early on any input event. Returns False once stopped."""
+        self.clock.sleep(seconds, self.wake)
+        self.drain_events()
+        return not self.stop_requested
+
+    def tick(self, scheduler):
+        """Wait for the scheduler's next deadline. Returns False once stopped."""
+        scheduler.wait()
+        self.drain_events()
+        return not self.stop_requested
+
+    def make_scheduler(self, interval):
+        return PollScheduler(self.clock, interval, self.wake, adaptive=self.settings["ADAPTIVE_POLL"])
+
+    def on_settings_changed(self, settings):
+        # Called from whichever thread saved or noticed the change; the worker applies it
+        self._pending_settings = settings
+
+    def apply_pending_settings(self):
+        settings, self._pending_settings = self._pending_settings, None
+        if settings is None:
             return
+        previous, self.settings = self.settings, settings
+        self.debug = settings["LOG_LEVEL"] == "DEBUG"
+        self.classifier.rebuild(settings)
+        self.capture.configure(settings)
+        if self.strategy is not None:
+            self.strategy.configure(settings)
+        if self.capture.is_open and any(previous[key] != settings[key] for key in SAMPLING_KEYS):
+            # The captured band and the stride are derived from these, so the capture starts over,
+            # but not mid-cycle: a capture process restart stalls polling for its start-up time
+            if self.state in (IDLE, ARMING):
+                self.restart_capture()
+            else:
+                self._resample = True
+        self.log("[INFO] Settings reloaded.")
 
+    def restart_capture(self):
+        self._resample = False
+        self.capture.close()
+        self.change.reset()
+        self.open_capture()
+
+    def set_state(self, state):
+        self.state = state
+
+    def run_cycle(self):
+        """Drive the state machine from a fresh press until it is idle again."""
+        handlers = {
+            ARMING: self.arm,
+            POLLING: self.handle_mouse_hold,
+            RELEASED: self.after_release,
+            REENGAGING: self.monitor_for_next_ore,
+        }
+        self.set_state(ARMING)
+        while self.state != IDLE and not self.stop_requested:
+            if self._pending_settings is not None:
+                self.apply_pending_settings()
+            self.set_state(handlers[self.state]())
+        # Early-opened sources (the capture process) stay up between presses until shutdown
+        if not self.capture.open_early:
+            self.end_session()
+            self._resample = False
+        elif self._resample and not self.stop_requested:
+            self.restart_capture()
+        self.set_state(IDLE)
+
+    def arm(self):
+        if self.capture.is_open:
+            self.capture.arm()
+        if not self.wait(self.settings["DEFAULT_DELAY"]) or not self.mouse_pressed:
+            return IDLE
+        if not self.open_capture():
+            return IDLE
+        return POLLING
+
+    def handle_mouse_hold(self):
         self.log("[INFO] Left click detected. Starting ROI polling.")
-        start_time = time.time()
-        max_crit_ratio = 0.0
-        triggered = False
+        scheduler = self.make_scheduler(self.settings["POLL_INTERVAL"])
+        scheduler.start()
+        start_time = self.clock.now()
+        cpu_start = time.thread_time()
+        self.history.begin(start_time, self.dead_time)
+        self.dead_time = None
+        self._last_gray = None
+        next_state = self.poll_bar(scheduler, start_time)
+        self.history.end()
+        self.report_cycle(scheduler, self.clock.now() - start_time, time.thread_time() - cpu_start)
+        return next_state
+
+    def release_strategy(self):
+        """Strategy named by the profile's own "strategy" if it has one, by RELEASE_MODE otherwise."""
+        name = self.roi.get("strategy") or self.settings["RELEASE_MODE"]
+        try:
+            return make_strategy(name, self.settings)
+        except ValueError as e:
+            self.log(f"[ERROR] {e}, using peak_drop.")
+            return make_strategy("peak_drop", self.settings)
+
+    def poll_bar(self, scheduler, start_time):
+        strategy = self.strategy = self.release_strategy()
+        locate = strategy.tracks_dot
+        phase_polling = self.settings["PHASE_POLLING"]
+        skip_unchanged = self.settings["SKIP_UNCHANGED"]
+        self.change.reset()
 
         while self.mouse_pressed and not self.stop_requested:
+            if self._pending_settings is not None:
+                self.apply_pending_settings()
+            self.stats.begin_frame()
             frame = self.capture_roi()
             if frame is None:
+                self.tick(scheduler)
                 continue
+            # A capture process stamps frames when they were grabbed, which may be a little earlier
+            frame_time = self.capture.last_timestamp
+            if frame_time is None:
+                frame_time = self.clock.now()
+            self.stats.mark("capture")
 
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-            dot_ratio = self.gray_ratio(gray, self.settings["DOT_GRAY"])         
-            fill_ratio = self.gray_ratio(gray, self.settings["FILL_GRAY"])
-            crit_ratio = self.gray_ratio(gray, self.settings["CRITICAL_GRAY"])
+            # An identical frame gives identical ratios, so only the timing-based checks below need rerunning
+            if not skip_unchanged or self.change.changed(frame):
+                gray = self.to_gray(frame)
+                self.stats.mark("convert")
+                if self.recorder:
+                    self.recorder.submit(gray, self.clock.now())
+                dot_ratio, fill_ratio, crit_ratio = self.frame_ratios(gray)
+                self.stats.mark("classify")
 
-            #self.log(f"[DEBUG] GrayMatch % — Dot: {dot_ratio:.2%}, Fill: {fill_ratio:.2%}, Critical: {crit_ratio:.2%}")
+                if self.debug:
+                    self.log(f"[DEBUG] GrayMatch % — Dot: {dot_ratio:.2%}, Fill: {fill_ratio:.2%}, Critical: {crit_ratio:.2%}")
 
-            if crit_ratio > max_crit_ratio:
-                max_crit_ratio = crit_ratio
+                dot_x = zone = None
+                if locate or phase_polling:
+                    dot_x, zone = self.classifier.locate(gray, self.stride)
+                    self.history.see_zone(zone)
+                elif self._last_gray is None:
+                    # The dot is usually clear of the zone this early, so it gives the zone's full width
+                    self.history.see_zone(self.classifier.locate(gray, self.stride)[1])
+                strategy.update(frame_time, (dot_ratio, fill_ratio, crit_ratio), dot_x, zone)
+                self.history.frame(frame_time, dot_ratio, fill_ratio, crit_ratio, dot_x)
+                self._last_gray = self.keep_frame(gray)
+                self._last_frame_time = frame_time
+            else:
+                self.stats.unchanged()
 
-            if dot_ratio > 0.01 and fill_ratio > 0.01:
-                drop_from_peak = max_crit_ratio - crit_ratio
-                if drop_from_peak >= 0.005 and max_crit_ratio > 0.01 and not triggered:
-                    self.log(f"[ACTION] Critical drop from peak: {max_crit_ratio:.2%} → {crit_ratio:.2%}")
-                    release_left_click()
-                    triggered = True
-                    break
+            decision = strategy.decide(self.clock.now(), scheduler.deadline)
+            if decision is not None:
+                release_at, message = decision
+                self.stats.mark("decide")
+                if self.clock.now() < release_at:
+                    if not self.clock.sleep_until(release_at, self.wake):
+                        self.drain_events()
+                        if not self.mouse_pressed or self.stop_requested:
+                            return IDLE
+                    self.stats.skip()
+                self.release(message)
+                return RELEASED
+            self.stats.mark("decide")
+            self.stats.end_frame()
+            self.stats.maybe_report(self.log, self.settings["STATS_INTERVAL"], self.settings["POLL_INTERVAL"])
 
-            if time.time() - start_time > self.settings["RESET_TIMEOUT"]:
+            if self.clock.now() - start_time > self.settings["RESET_TIMEOUT"]:
+                self.history.timed_out()
                 self.log("[INFO] Timeout: no critical zone triggered.")
-                self.mining_thread_active = False
-                return
+                return IDLE
 
-            time.sleep(self.settings["POLL_INTERVAL"])
+            if phase_polling:
+                scheduler.retarget(self.phase_interval())
+            self.tick(scheduler)
 
-        if self.continuous and not self.stop_requested:
-            self.monitor_for_next_ore()
-        else:
-            self.mining_thread_active = False
+        # Mouse let go by the user (or stop requested) before the critical zone
+        return IDLE
+
+    def release(self, message):
+        self.input.release()
+        self.stats.mark("input")
+        self.stats.end_frame()
+        self.mouse_pressed = False
+        self.record_release()
+        self.log(message)
+
+    def record_release(self):
+        """Log where the dot was relative to the zone when the release went out."""
+        now = self.clock.now()
+        self._released_at = now
+        if self._last_gray is None:
+            self.history.released(now, None, None)
+            return
+        dot_x, zone = self.classifier.locate(self._last_gray, self.stride)
+        tracker = self.strategy.tracker
+        velocity = tracker.velocity()
+        if dot_x is not None and velocity is not None:
+            # Carry the dot forward from the last frame to the release
+            dot_x += velocity * (now - self._last_frame_time)
+        self.history.released(now, dot_x, tracker.zone or zone, self.classifier.dot_width)
+
+    def phase_interval(self):
+        """Poll slowly while the dot is far from the zone and at full rate as it closes in."""
+        hot = self.settings["POLL_INTERVAL"]
+        eta = self.strategy.tracker.time_to_zone()
+        if eta is None:
+            return hot
+        # A few polls before the dot reaches the zone edge at any rate
+        return min(max(eta / 4, hot), max(self.settings["IDLE_POLL_INTERVAL"], hot))
+
+    def report_cycle(self, scheduler, duration, cpu_time):
+        if self.settings["STATS_INTERVAL"] <= 0:
+            return
+        self.log(self.history.format_summary())
+        if scheduler.missed:
+            self.log(scheduler.summary())
+        # A POLL_INTERVAL of 0 polls as fast as possible, which has no fixed-rate count to compare against
+        if self.settings["PHASE_POLLING"] and scheduler.ticks and self.settings["POLL_INTERVAL"] > 0:
+            polls = scheduler.ticks + 1
+            fixed_polls = max(duration / self.settings["POLL_INTERVAL"], 1)
+            fixed_cpu = cpu_time / polls * fixed_polls
+            saved = 1 - cpu_time / fixed_cpu if fixed_cpu > 0 else 0.0
+            self.log(f"[STATS] Cycle CPU: {cpu_time * 1000:.1f} ms over {polls} polls "
+                     f"(fixed-rate estimate {fixed_cpu * 1000:.1f} ms over {fixed_polls:.0f} polls, {saved:.0%} saved)")
+
+    def after_release(self):
+        return REENGAGING if self.continuous else IDLE
 
     def monitor_for_next_ore(self):
-        attempts = 0
+        """Press once for the next ore and watch at the polling rate until its bar shows up.
 
-        while not self.stop_requested and attempts < self.settings["MAX_REENGAGE_ATTEMPTS"]:
-            time.sleep(self.settings["RECHECK_GRACE_PERIOD"])
-            self.log("[INFO] Re-engaging for continuous mining...")
-            pyautogui.mouseDown()
-            self.mouse_pressed = True
+        The press waits RECHECK_GRACE_PERIOD after the release so the game
+        sees a distinct click. The old bar can still be on screen after
+        that, so a bar only counts once it has been seen gone, or a further
+        RECHECK_GRACE_PERIOD after the press at the latest. Goes straight to
+        POLLING, without DEFAULT_DELAY.
+        """
+        relocated = False
+        if not self.wait(self.settings["RECHECK_GRACE_PERIOD"]):
+            return IDLE
+        self.log("[INFO] Re-engaging for continuous mining...")
+        self.input.press()
+        self.mouse_pressed = True
+        pressed_at = self.clock.now()
+        deadline = pressed_at + self.settings["REENGAGE_TIMEOUT"]
+        bar_gone = False
+        found = False
+        scheduler = self.make_scheduler(self.settings["POLL_INTERVAL"])
+        scheduler.start()
+        self.change.reset()
 
+        # The listener echoes our own release and press back as events, in no fixed
+        # order relative to this loop, so mouse_pressed isn't trusted until polling starts
+        while not self.stop_requested:
             frame = self.capture_roi()
             if frame is None:
-                break
+                # Failed, or woken by an input event before the capture process had a frame
+                if self.clock.now() >= deadline or not self.tick(scheduler):
+                    break
+                continue
 
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            fill_ratio = self.gray_ratio(gray, self.settings["FILL_GRAY"])
-            crit_ratio = self.gray_ratio(gray, self.settings["CRITICAL_GRAY"])
+            # Nothing on screen changed since the last check, so the answer is the same
+            if not self.settings["SKIP_UNCHANGED"] or self.change.changed(frame):
+                gray = self.to_gray(frame)
+                if self.recorder:
+                    self.recorder.submit(gray, self.clock.now())
+                _, fill_ratio, crit_ratio = self.frame_ratios(gray)
+                found = fill_ratio > self.settings["GATE_RATIO"] and crit_ratio > self.settings["MIN_PEAK"]
 
-            # self.log(f"[DEBUG] Re-check ratios — Fill: {fill_ratio:.2%}, Critical: {crit_ratio:.2%}")
+                if self.debug:
+                    self.log(f"[DEBUG] Re-check ratios — Fill: {fill_ratio:.2%}, Critical: {crit_ratio:.2%}")
 
-            if fill_ratio > 0.01 and crit_ratio > 0.01:
+            now = self.clock.now()
+            if found and (bar_gone or now - pressed_at >= self.settings["RECHECK_GRACE_PERIOD"]):
+                self.dead_time = now - self._released_at if self._released_at is not None else None
+                self.mouse_pressed = True
                 self.log("[INFO] Bar detected. Continuing mining.")
-                self.mining_thread_active = False
-                threading.Thread(target=self.handle_mouse_hold, daemon=True).start()
-                return
-            else:
-                self.log("[INFO] No valid bar detected. Rechecking...")
-                attempts += 1
+                return POLLING
+            bar_gone = bar_gone or not found
+
+            if now >= deadline:
+                if not self.settings["AUTO_LOCATE"] or relocated:
+                    break
+                # The bar may have moved (window moved, resolution changed); look for it once
+                relocated = True
+                if not self.relocate_roi():
+                    break
+                self.change.reset()
+                deadline = self.clock.now() + self.settings["REENGAGE_TIMEOUT"]
 
-        pyautogui.mouseUp()
+            if not self.tick(scheduler):
+                break
+
+        self.input.release()
         self.mouse_pressed = False
-        self.log("[INFO] Max attempts reached. Giving up re-engagement.")
-        self.mining_thread_active = False
+        if not self.stop_requested:
+            self.log("[INFO] No bar appeared. Giving up re-engagement.")
+        return IDLE
+
+    def open_capture(self):
+        if self.capture.is_open:
+            return True
+        try:
+            roi = band_roi(self.roi, self.settings["ROW_SAMPLES"])
+            self.capture.open(roi)
+        except Exception as e:
+            self.log(f"[ERROR] Failed to open capture: {e}")
+            return False
+        stride = effective_stride(roi, self.settings)
+        if stride != self.stride:
+            self.log(f"[INFO] Sampling every {stride} px: {sampled_pixels(roi, stride)} of {roi['width'] * roi['height']} pixels per frame.")
+        self.stride = stride
+        return True
+
+    def relocate_roi(self):
+        """Search the screen for the bar and switch to its ROI. Returns True if the ROI changed."""
+        start = self.clock.now()
+        try:
+            screen, left, top = self.capture.grab_screen()
+        except NotImplementedError:
+            return False
+        except Exception as e:
+            self.log(f"[ERROR] Failed to capture screen for auto-locate: {e}")
+            return False
+        found = locate_bar(cv2.cvtColor(screen, cv2.COLOR_BGRA2GRAY), self.settings)
+        elapsed = (self.clock.now() - start) * 1000
+        if found is None:
+            self.log(f"[INFO] Auto-locate: no mining bar on screen ({elapsed:.0f} ms).")
+            return False
+        found["x"] += left
+        found["y"] += top
+        if all(found[k] == self.roi.get(k) for k in found):
+            return False
+        # Saved rows belong to the old ROI; keep any other profile fields such as the input target
+        self.roi = {**{k: v for k, v in self.roi.items() if k != "rows"}, **found}
+        self.save_roi()
+        self.capture.close()
+        self.log(f"[INFO] Auto-locate: ROI moved to {found} ({elapsed:.0f} ms).")
+        return self.open_capture()
+
+    def save_roi(self):
+        try:
+            update_profile(self.profile, self.roi)
+        except Exception as e:
+            self.log(f"[ERROR] Failed to save ROI config: {e}")
+
+    def end_session(self):
+        self.capture.close()
 
     def capture_roi(self):
         try:
-            x, y, w, h = self.roi['x'], self.roi['y'], self.roi['width'], self.roi['height']
-            with mss.mss() as sct:
-                monitor = {"top": y, "left": x, "width": w, "height": h}
-                sct_img = sct.grab(monitor)
-                frame = np.array(sct_img)[:, :, :3]
-                return frame
+            frame = self.capture.grab()
+            if frame is None:
+                return None
+            # Subsample as a strided view; ratios are fractions so thresholds carry over
+            return frame[::self.stride, ::self.stride] if self.stride > 1 else frame
         except Exception as e:
             self.log(f"[ERROR] Failed to capture ROI: {e}")
             return None
 
-    def gray_ratio(self, gray_img, target, tolerance=None):
-        if tolerance is None:
-            tolerance = self.settings["TOLERANCE"]
-        mask = (gray_img >= (target - tolerance)) & (gray_img <= (target + tolerance))
-        return np.count_nonzero(mask) / mask.size
+    def to_gray(self, frame):
+        if frame.ndim == 2:
+            return frame
+        if self._gray is None or self._gray.shape != frame.shape[:2]:
+            self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+        code = cv2.COLOR_BGRA2GRAY if frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        return cv2.cvtColor(frame, code, dst=self._gray)
+
+    def keep_frame(self, gray):
+        """Copy of `gray` for use after later grabs, which may overwrite the source's buffers."""
+        if self._kept is None or self._kept.shape != gray.shape:
+            self._kept = np.empty_like(gray)
+        np.copyto(self._kept, gray)
+        return self._kept
+
+    def frame_ratios(self, gray):
+        # Sources that classify frames themselves (the capture process) already did the work
+        ratios = self.capture.last_ratios
+        return ratios if ratios is not None else self.classifier.ratios(gray)
+
+    def profile_stats(self):
+        """{profile name: (stats, history)}, shaped like DetectorGroup's."""
+        return {self.profile or DEFAULT_PROFILE: (self.stats, self.history)}
+
+    def start_recording(self, path):
+        self.recorder = FrameRecorder(path)
+        self.recorder.start()
+        self.log(f"[INFO] Recording frames to {path}")
+
+    def stop_recording(self):
+        if not self.recorder:
+            return
+        recorder, self.recorder = self.recorder, None
+        recorder.stop()
+        self.log(f"[INFO] Recording stopped: {recorder.written} frames written, {recorder.dropped} dropped.")
 
     def run_forever(self):
+        """Worker thread: sleeps on the event queue while idle and runs one cycle per press."""
         self.running = True
+        subscribe(self.on_settings_changed)
+        if self.capture.open_early and self.open_capture():
+            self.log("[INFO] Capture process started.")
         self.log("[INFO] Detector armed. Holding for clicks...")
         try:
             while not self.stop_requested:
-                time.sleep(0.1)
+                self.handle_event(self.events.get())
+                self.drain_events()
+                if self.mouse_pressed and not self.stop_requested:
+                    self.run_cycle()
         except Exception as e:
             self.log(f"[ERROR] Detector exception: {e}")
+        finally:
+            self.shutdown()
         self.log("[INFO] Detector loop terminated.")
 
+    def shutdown(self):
+        unsubscribe(self.on_settings_changed)
+        if self.mouse_pressed:
+            self.input.release()
+            self.mouse_pressed = False
+        self.end_session()
+        self.stop_recording()
+        self.running = False
+
     def stop(self):
-        self.stop_requested = True
+        """Ask the worker to stop; it wakes immediately and cleans up on its own thread."""
         if self.listener:
             self.listener.stop()
-        pyautogui.mouseUp()
-        self.mouse_pressed = False
-        self.mining_thread_active = False
+        was_running = self.running
+        self.post(STOP)
+        self.stop_requested = True
+        if not was_running:
+            self.shutdown()
         self.log("[INFO] Detector listener stopped.")
@@ -0,0 +1,115 @@
+import os
+import time
+import threading
+from collections import deque
+from capture import SharedCapture, SliceCapture
+from detector import Detector, PRESS, RELEASE
+from input_backend import SystemInput
+from profiles import load_profiles
+
+ECHO_WINDOW = 0.1 # A listener event this soon after our own press/release of the same kind is taken as its echo
+
+class DetectorGroup:
+    """Runs one Detector per ROI profile in a single process.
+
+    All detectors read their frames from one SharedCapture, whose capture
+    thread grabs the bounding box of all bars once per poll interval and
+    publishes the newest frame, so N bars cost one screen grab per tick
+    instead of N. A single mouse listener routes
+    each press to the profile whose bar is closest to the click, and the
+    matching release to the same profile. A profile's optional "target"
+    ({"x", "y"}) is where its presses and releases are sent. The presses
+    and releases the detectors send themselves (continuous re-engagement)
+    come back through the listener too; those echoes are ignored rather
+    than routed, so they can't arm another profile.
+    """
+
+    def __init__(self, log_func=print, continuous=False, profiles=None):
+        self.log = log_func
+        self.profiles = profiles if profiles is not None else load_profiles()
+        self.shared = SharedCapture()
+        self._echoes = deque()
+        self._echo_lock = threading.Lock()
+        self.detectors = {}
+        for name, roi in self.profiles.items():
+            self.detectors[name] = Detector(
+                log_func=self._prefixed(name),
+                continuous=continuous,
+                capture=SliceCapture(self.shared),
+                input_backend=SystemInput(roi.get("target"), on_event=self._issued),
+                roi=roi,
+                listen=False,
+                profile=name,
+            )
+        self.threads = []
+        self.listener = None
+        self._pressed_on = None
+
+    def _prefixed(self, name):
+        return lambda message: self.log(f"[{name}] {message}")
+
+    def profile_stats(self):
+        """{profile name: (stats, history)} of every detector."""
+        return {name: (d.stats, d.history) for name, d in self.detectors.items()}
+
+    def start_listener(self):
+        from pynput import mouse
+        self._left_button = mouse.Button.left
+        self.listener = mouse.Listener(on_click=self.on_click)
+        self.listener.start()
+
+    def nearest(self, x, y):
+        def distance(name):
+            roi = self.profiles[name].get("target") or self.profiles[name]
+            cx = roi["x"] + roi.get("width", 0) / 2
+            cy = roi["y"] + roi.get("height", 0) / 2
+            return (cx - x) ** 2 + (cy - y) ** 2
+        return min(self.detectors, key=distance)
+
+    def _issued(self, action):
+        with self._echo_lock:
+            self._echoes.append((action, time.perf_counter()))
+
+    def _is_echo(self, action):
+        now = time.perf_counter()
+        with self._echo_lock:
+            while self._echoes and now - self._echoes[0][1] > ECHO_WINDOW:
+                self._echoes.popleft()
+            for i, (issued, _) in enumerate(self._echoes):
+                if issued == action:
+                    del self._echoes[i]
+                    return True
+        return False
+
+    def on_click(self, x, y, button, pressed):
+        if button != self._left_button:
+            return
+        if self._is_echo(PRESS if pressed else RELEASE):
+            return
+        if pressed:
+            self._pressed_on = self.nearest(x, y)
+            self.detectors[self._pressed_on].post(PRESS)
+        elif self._pressed_on is not None:
+            self.detectors[self._pressed_on].post(RELEASE)
+            self._pressed_on = None
+
+    def start_recording(self, path):
+        root, ext = os.path.splitext(path)
+        for name, detector in self.detectors.items():
+            detector.start_recording(f"{root}-{name}{ext}")
+
+    def run_forever(self):
+        self.start_listener()
+        self.log(f"[INFO] Running {len(self.detectors)} profiles: {', '.join(self.detectors)}")
+        self.threads = [threading.Thread(target=d.run_forever, daemon=True) for d in self.detectors.values()]
+        for thread in self.threads:
+            thread.start()
+        for thread in self.threads:
+            thread.join()
+        self.shared.close()
+
+    def stop(self):
+        if self.listener:
+            self.listener.stop()
+        for detector in self.detectors.values():
+            detector.stop()
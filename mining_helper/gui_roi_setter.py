@@ -1,21 +1,26 @@
 import sys
-import json
 import threading
+import time
 import os
-from detector import Detector
 from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QTextEdit,
-    QVBoxLayout, QHBoxLayout, QCheckBox, QToolButton
+    QVBoxLayout, QHBoxLayout, QCheckBox, QToolButton, QFileDialog,
+    QComboBox, QInputDialog, QLabel
 )
-from PyQt5.QtCore import QRect, Qt, QPoint
-from PyQt5.QtGui import QPainter, QColor, QIcon
+from PyQt5.QtCore import QRect, Qt, QPoint, QTimer
+from PyQt5.QtGui import QPainter, QColor, QIcon, QTextCursor
 from settings_dialog import SettingsDialog
-from config_manager import load_settings
-from controller import enable_remap, bind_remap, get_keybind
+from config_manager import load_settings, start_watcher, subscribe
+from log_buffer import LogBuffer
+from controller import enable_remap, bind_remap, get_keybind, start_listeners
+from profiles import DEFAULT_PROFILE, DEFAULT_ROI, load_profiles, update_profile
 
-CONFIG_FILE = "roi_config.json"
+RECORDINGS_DIR = "recordings"
 HANDLE_SIZE = 10
+LOG_FLUSH_MS = 50 # How often queued log lines are rendered into the console
+MAX_CONSOLE_LINES = 2000 # Older console lines are discarded past this
+HEALTH_REFRESH_MS = 1000 # How often the capture process status line is refreshed
 
 def resource_path(relative_path):
         """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -102,9 +107,17 @@ class ROISetter(QWidget):
 
         self.detector = None
         self.detector_thread = None
+        self.warmup_thread = None
+        self.last_profile_stats = None
+
+        # Worker threads only push into this; the GUI thread renders it on a timer
+        self.logs = LogBuffer(level=load_settings()["LOG_LEVEL"])
+        subscribe(lambda settings: self.logs.set_level(settings["LOG_LEVEL"]))
         
         self.overlay = None
+        self.profile = self.profile_names()[0]
         self.roi = self.load_roi()
+        start_watcher()
         self.init_ui()
         self.show()
 
@@ -112,6 +125,7 @@ class ROISetter(QWidget):
     def init_ui(self):
         self.console = QTextEdit()
         self.console.setReadOnly(True)
+        self.console.document().setMaximumBlockCount(MAX_CONSOLE_LINES)
         self.console.setStyleSheet("""
             QTextEdit {
                 background-color: #fafafa;
@@ -127,15 +141,17 @@ class ROISetter(QWidget):
         self.stop_button = QPushButton("Stop")
         self.setter_button = QPushButton("Setter Mode")
         self.save_button = QPushButton("Save ROI")
+        self.locate_button = QPushButton("Auto ROI")
         self.settings_button = QPushButton("Settings")
         self.remap_button = QPushButton("Keybind")
+        self.export_button = QPushButton("Export Stats")
 
         self.stop_button.setEnabled(False)
 
         self.update_remap_button()
         bind_remap(self.update_remap_button, self.toggle_detector)
 
-        for btn in [self.start_button, self.stop_button, self.setter_button, self.save_button]:
+        for btn in [self.start_button, self.stop_button, self.setter_button, self.save_button, self.locate_button]:
             btn.setStyleSheet("""
                 QPushButton {
                     background-color: #e0e0e0;
@@ -152,21 +168,41 @@ class ROISetter(QWidget):
         self.stop_button.clicked.connect(self.stop_detector)
         self.setter_button.clicked.connect(self.toggle_setter_mode)
         self.save_button.clicked.connect(self.save_roi)
+        self.locate_button.clicked.connect(self.auto_locate_roi)
         self.settings_button.clicked.connect(self.open_settings)
         self.remap_button.clicked.connect(self.begin_remap)
+        self.export_button.clicked.connect(self.export_stats)
+
+        self.profile_box = QComboBox()
+        self.profile_box.setToolTip("ROI profile edited by Setter Mode / Save ROI. All profiles run when started.")
+        self.profile_box.addItems(self.profile_names())
+        self.profile_box.currentTextChanged.connect(self.select_profile)
+        self.new_profile_button = QPushButton("New Profile")
+        self.new_profile_button.clicked.connect(self.new_profile)
 
         self.continuous_checkbox = QCheckBox("Continuous Mode")
         self.continuous_checkbox.setStyleSheet("color: black; margin-left: 12px;")
         self.continuous_checkbox.setChecked(True) # On by default
 
+        self.record_checkbox = QCheckBox("Record Frames")
+        self.record_checkbox.setStyleSheet("color: black;")
+
         button_layout = QHBoxLayout()
         button_layout.addWidget(self.start_button)
         button_layout.addWidget(self.stop_button)
         button_layout.addWidget(self.setter_button)
         button_layout.addWidget(self.save_button)
+        button_layout.addWidget(self.locate_button)
         button_layout.addWidget(self.settings_button)
         button_layout.addWidget(self.remap_button)
+        button_layout.addWidget(self.export_button)
         button_layout.addWidget(self.continuous_checkbox)
+        button_layout.addWidget(self.record_checkbox)
+
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(self.profile_box)
+        profile_layout.addWidget(self.new_profile_button)
+        profile_layout.addStretch()
 
         clear_button = QToolButton(self.console)
         clear_button.setIcon(QIcon(resource_path("assets/clear_icon.svg")))
@@ -190,42 +226,119 @@ class ROISetter(QWidget):
     
         layout = QVBoxLayout()
         layout.addLayout(button_layout)
+        layout.addLayout(profile_layout)
         layout.addWidget(self.console)
+
+        self.health_label = QLabel()
+        self.health_label.setStyleSheet("color: gray;")
+        self.health_label.hide()
+        layout.addWidget(self.health_label)
     
         self.setLayout(layout)
 
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start(LOG_FLUSH_MS)
+
+        self.health_timer = QTimer(self)
+        self.health_timer.timeout.connect(self.update_health)
+        self.health_timer.start(HEALTH_REFRESH_MS)
+
     def start_detector(self):
         if self.detector:
             self.log("Detector is already running.")
             return
 
         continuous = self.continuous_checkbox.isChecked()
-        settings = load_settings()
 
-        self.detector = Detector(log_func=self.log, continuous=continuous)
+        # Waits on the import lock if warm_up() is still loading these
+        if len(self.profile_names()) > 1:
+            from detector_group import DetectorGroup
+            self.detector = DetectorGroup(log_func=self.log, continuous=continuous)
+        else:
+            from detector import Detector
+            self.detector = Detector(log_func=self.log, continuous=continuous, profile=self.profile)
+        if self.record_checkbox.isChecked():
+            os.makedirs(RECORDINGS_DIR, exist_ok=True)
+            self.detector.start_recording(os.path.join(RECORDINGS_DIR, datetime.now().strftime("session-%Y%m%d-%H%M%S.mhrec")))
         self.detector_thread = threading.Thread(target=self.detector.run_forever, daemon=True)
         self.detector_thread.start()
         self.log("Detector started.")
         self.continuous_checkbox.setEnabled(False)
+        self.record_checkbox.setEnabled(False)
+        self.new_profile_button.setEnabled(False)
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
 
     def stop_detector(self):
         if self.detector:
             self.detector.stop()
+            self.last_profile_stats = self.detector.profile_stats()
             self.detector = None
             self.detector_thread = None
             self.log("Detector stopped.")
             self.continuous_checkbox.setEnabled(True)
+            self.record_checkbox.setEnabled(True)
+            self.new_profile_button.setEnabled(True)
             self.start_button.setEnabled(True)
             self.stop_button.setEnabled(False)
 
+    def warm_up(self):
+        """Load the detection stack and start the keybind listeners off the GUI thread.
+
+        Called once the window is showing, so the first Start or keybind
+        press doesn't pay for importing cv2/mss/pynput.
+        """
+        if self.warmup_thread is not None:
+            return
+
+        def load():
+            try:
+                import detector
+                import mss
+                start_listeners()
+            except Exception as e:
+                self.log(f"[ERROR] Failed to load detection stack: {e}")
+
+        self.warmup_thread = threading.Thread(target=load, daemon=True)
+        self.warmup_thread.start()
+
     def toggle_detector(self):
         if self.detector:
             self.stop_detector()
         else:
             self.start_detector()
 
+    def profile_names(self):
+        try:
+            return list(load_profiles()) or [DEFAULT_PROFILE]
+        except Exception:
+            return [DEFAULT_PROFILE]
+
+    def select_profile(self, name):
+        if not name:
+            return
+        self.profile = name
+        self.roi = self.load_roi()
+        if self.overlay:
+            self.overlay.roi = QRect(self.roi)
+            self.overlay.update()
+        self.log(f"Editing profile: {name}")
+
+    def new_profile(self):
+        name, ok = QInputDialog.getText(self, "New Profile", "Profile name:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        if name in self.profile_names():
+            self.log(f"Profile {name} already exists.")
+            return
+        # Start the new profile from the current ROI so it can be dragged into place
+        self.profile = name
+        self.save_roi()
+        self.profile_box.addItem(name)
+        self.profile_box.setCurrentText(name)
+
     def toggle_setter_mode(self):
         if self.overlay:
             self.overlay.close()
@@ -246,22 +359,128 @@ class ROISetter(QWidget):
             "width": self.roi.width(),
             "height": self.roi.height()
         }
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(roi_data, f)
-        self.log(f"ROI saved: {roi_data}")
+        row_samples = load_settings()["ROW_SAMPLES"]
+        if row_samples > 0:
+            rows = self.pick_rows(roi_data, row_samples)
+            if rows:
+                roi_data["rows"] = rows
+        try:
+            existing = load_profiles().get(self.profile, {})
+        except Exception:
+            existing = {}
+        # Keep per-profile extras such as the input target
+        extras = {k: v for k, v in existing.items() if k not in ("x", "y", "width", "height", "rows")}
+        update_profile(self.profile, {**extras, **roi_data})
+        self.log(f"ROI saved ({self.profile}): {roi_data}")
+
+    def auto_locate_roi(self):
+        import time
+        import cv2
+        from capture import MSSCapture
+        from locator import locate_bar
+
+        start = time.perf_counter()
+        try:
+            screen, left, top = MSSCapture().grab_screen()
+        except Exception as e:
+            self.log(f"[ERROR] Failed to capture screen: {e}")
+            return
+        found = locate_bar(cv2.cvtColor(screen, cv2.COLOR_BGRA2GRAY), load_settings())
+        elapsed = (time.perf_counter() - start) * 1000
+        if found is None:
+            self.log(f"No mining bar found on screen ({elapsed:.0f} ms). Make sure the bar is visible.")
+            return
+        self.roi = QRect(found["x"] + left, found["y"] + top, found["width"], found["height"])
+        if self.overlay:
+            self.overlay.roi = QRect(self.roi)
+            self.overlay.update()
+        self.log(f"Mining bar found in {elapsed:.0f} ms.")
+        self.save_roi()
+
+    def pick_rows(self, roi_data, count):
+        import cv2
+        from capture import MSSCapture
+        from projection import select_rows
+
+        try:
+            with MSSCapture() as capture:
+                capture.open(roi_data)
+                gray = cv2.cvtColor(capture.grab(), cv2.COLOR_BGRA2GRAY)
+        except Exception as e:
+            self.log(f"[ERROR] Failed to capture ROI for row selection: {e}")
+            return None
+        rows = select_rows(gray, load_settings(), count)
+        if rows is None:
+            self.log("No mining bar visible in the ROI, analyzing the center rows instead.")
+        else:
+            self.log(f"Analyzing ROI rows {rows[0]}-{rows[-1]}.")
+        return rows
 
     def load_roi(self):
         try:
-            with open(CONFIG_FILE, "r") as f:
-                data = json.load(f)
-                return QRect(data["x"], data["y"], data["width"], data["height"])
+            data = load_profiles()[self.profile]
+            return QRect(data["x"], data["y"], data["width"], data["height"])
         except:
-            return QRect(500, 500, 200, 50)
+            return QRect(DEFAULT_ROI["x"], DEFAULT_ROI["y"], DEFAULT_ROI["width"], DEFAULT_ROI["height"])
 
     def log(self, message):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.console.append(f"[{timestamp}] {message}")
-        print(f"[LOG] {message}")
+        # Safe from any thread: nothing here touches Qt or stdout
+        self.logs.push(message)
+
+    def flush_log(self):
+        batch = self.logs.drain()
+        dropped = self.logs.new_drops()
+        if dropped:
+            # The lost lines were older than anything in the batch
+            batch.insert(0, (batch[0][0] if batch else time.time(), "WARN", f"[WARN] {dropped} log lines dropped, the console fell behind"))
+        if not batch:
+            return
+        lines = [f"[{datetime.fromtimestamp(t).strftime('%H:%M:%S')}] {message}" for t, _, message in batch]
+        scrollbar = self.console.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        cursor = QTextCursor(self.console.document())
+        cursor.movePosition(QTextCursor.End)
+        prefix = "\n" if not self.console.document().isEmpty() else ""
+        cursor.insertText(prefix + "\n".join(lines))
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+        print("\n".join(f"[LOG] {message}" for _, _, message in batch))
+
+    def update_health(self):
+        capture = getattr(self.detector, "capture", None)
+        health = capture.health() if hasattr(capture, "health") else None
+        if health is None:
+            self.health_label.hide()
+            return
+        if not health["alive"]:
+            text = f"Capture process: not running ({health['errors']} errors)"
+        else:
+            age = health["frame_age_ms"]
+            text = (f"Capture process {health['pid']}: {health['fps']:.0f} fps, "
+                    f"newest frame {'-' if age is None else f'{age:.1f} ms'} old, "
+                    f"grab {health['grab_ms']:.2f} ms, classify {health['classify_ms']:.2f} ms, "
+                    f"{health['errors']} errors")
+        self.health_label.setText(text)
+        self.health_label.show()
+
+    def export_stats(self):
+        profiles = self.detector.profile_stats() if self.detector else self.last_profile_stats
+        if not profiles or not any(stats.records for stats, _ in profiles.values()):
+            self.log("No frame stats recorded yet.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Stats", "frame_stats.csv", "CSV (*.csv);;JSON (*.json)")
+        if not path:
+            return
+        root, ext = os.path.splitext(path)
+        for name, (stats, history) in profiles.items():
+            # Several profiles get one file each, suffixed like their recordings
+            base = root if len(profiles) == 1 else f"{root}-{name}"
+            if stats.records:
+                stats.export(base + ext)
+                self.log(f"Exported {len(stats.records)} frame samples to {base + ext}")
+            if history.cycles:
+                history.export(base + "-cycles.json")
+                self.log(f"Exported {len(history.cycles)} cycle traces to {base}-cycles.json")
 
     def open_settings(self):
         dialog = SettingsDialog(self)
@@ -269,12 +488,14 @@ class ROISetter(QWidget):
 
     def begin_remap(self):
         self.remap_button.setText("Press key...")
+        start_listeners()
         enable_remap()
     
     def update_remap_button(self):
         self.remap_button.setText(f"Keybind: {get_keybind()}")
 
     def closeEvent(self, event):
+        self.flush_log()
         if self.overlay:
             self.overlay.close()
         event.accept()
@@ -282,4 +503,5 @@ class ROISetter(QWidget):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     win = ROISetter()
+    QTimer.singleShot(0, win.warm_up)
     sys.exit(app.exec_())
@@ -0,0 +1,71 @@
+class InputBackend:
+    """Where the detector sends its mouse presses and releases."""
+
+    def press(self):
+        raise NotImplementedError
+
+    def release(self):
+        raise NotImplementedError
+
+class SystemInput(InputBackend):
+    """Real mouse input through one pynput controller, created on first use.
+
+    pynput posts the event straight to the OS (SendInput on Windows) with no
+    built-in pause or failsafe check, so the press and release both go
+    through the same minimal path. With a `target` ({"x", "y"}) the cursor
+    is moved there before each press and release, so several game clients
+    can be driven from one process. `on_event(action)` is called right
+    before each event is sent, so mouse listeners can tell it apart from
+    the user's own clicks.
+    """
+
+    def __init__(self, target=None, on_event=None):
+        self.target = (target["x"], target["y"]) if target else None
+        self.on_event = on_event
+        self._mouse = None
+        self._button = None
+
+    def _controller(self):
+        if self._mouse is None:
+            from pynput import mouse
+            self._mouse = mouse.Controller()
+            self._button = mouse.Button.left
+        return self._mouse
+
+    def press(self):
+        controller = self._controller()
+        if self.on_event:
+            self.on_event("press")
+        if self.target:
+            controller.position = self.target
+        controller.press(self._button)
+
+    def release(self):
+        controller = self._controller()
+        if self.on_event:
+            self.on_event("release")
+        if self.target:
+            controller.position = self.target
+        controller.release(self._button)
+
+class RecordingInput(InputBackend):
+    """Fake input that records (action, time) pairs instead of touching the mouse."""
+
+    def __init__(self, clock, on_event=None):
+        self.clock = clock
+        self.on_event = on_event
+        self.events = []
+
+    def press(self):
+        self._record("press")
+
+    def release(self):
+        self._record("release")
+
+    def _record(self, action):
+        self.events.append((action, self.clock.now()))
+        if self.on_event:
+            self.on_event(action)
+
+    def times(self, action):
+        return [t for a, t in self.events if a == action]
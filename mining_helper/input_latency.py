@@ -0,0 +1,133 @@
+import argparse
+import queue
+import time
+import numpy as np
+from config_manager import update_settings
+
+SAMPLES = 20
+GAP = 0.02 # Pause between samples so events don't pile up in the OS queue
+TIMEOUT = 0.5 # An event not delivered within this is counted as missed
+
+class ListenerSink:
+    """Timestamps left-button events as the OS delivers them, via a pynput listener.
+
+    Works against the real desktop or a virtual display (e.g. Xvfb), so the
+    measured latency covers the whole call -> OS -> delivery path.
+    """
+
+    def __init__(self):
+        self.events = queue.SimpleQueue()
+        self.listener = None
+
+    def start(self):
+        from pynput import mouse
+
+        def on_click(x, y, button, pressed):
+            if button == mouse.Button.left:
+                self.events.put(("press" if pressed else "release", time.perf_counter()))
+
+        self.listener = mouse.Listener(on_click=on_click)
+        self.listener.start()
+        self.listener.wait()
+
+    def wait(self, timeout):
+        return self.events.get(timeout=timeout)
+
+    def stop(self):
+        if self.listener:
+            self.listener.stop()
+        self.listener = None
+
+class CallbackSink:
+    """In-process stand-in sink; pass it as RecordingInput's on_event.
+
+    Measures only the dispatch overhead of the backend abstraction itself,
+    which is useful as a floor and where no display is available.
+    """
+
+    def __init__(self):
+        self.events = queue.SimpleQueue()
+
+    def __call__(self, action):
+        self.events.put((action, time.perf_counter()))
+
+    def start(self):
+        pass
+
+    def wait(self, timeout):
+        return self.events.get(timeout=timeout)
+
+    def stop(self):
+        pass
+
+def measure(backend, sink, samples=SAMPLES, gap=GAP, timeout=TIMEOUT):
+    """Time press() and release() from the call until the sink sees the event.
+
+    Returns {"press": [...], "release": [...], "missed": n} with latencies in
+    seconds.
+    """
+    result = {"press": [], "release": [], "missed": 0}
+    sink.start()
+    try:
+        for _ in range(samples):
+            for action in ("press", "release"):
+                sent = time.perf_counter()
+                getattr(backend, action)()
+                try:
+                    while True:
+                        seen, delivered = sink.wait(max(0.0, sent + timeout - time.perf_counter()))
+                        if seen == action:
+                            break
+                    result[action].append(delivered - sent)
+                except queue.Empty:
+                    result["missed"] += 1
+                time.sleep(gap)
+    finally:
+        sink.stop()
+    return result
+
+def summarize(result):
+    lines = []
+    for action in ("press", "release"):
+        values = np.asarray(result[action]) * 1000
+        if values.size == 0:
+            lines.append(f"{action:>7}: no events delivered")
+            continue
+        p50, p95 = np.percentile(values, [50, 95])
+        lines.append(f"{action:>7}: p50 {p50:.3f} ms  p95 {p95:.3f} ms  max {values.max():.3f} ms  (n={values.size})")
+    if result["missed"]:
+        lines.append(f" missed: {result['missed']}")
+    return "\n".join(lines)
+
+def release_latency(result):
+    """Median release latency in seconds, the value INPUT_LATENCY expects."""
+    return float(np.median(result["release"])) if result["release"] else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure mouse input dispatch latency.")
+    parser.add_argument("--samples", type=int, default=SAMPLES)
+    parser.add_argument("--fake", action="store_true", help="measure against an in-process sink instead of the OS")
+    parser.add_argument("--save", action="store_true", help="write the median release latency to INPUT_LATENCY")
+    args = parser.parse_args()
+
+    if args.fake:
+        from clock import SystemClock
+        from input_backend import RecordingInput
+        sink = CallbackSink()
+        backend = RecordingInput(SystemClock(), on_event=sink)
+    else:
+        from input_backend import SystemInput
+        print("Clicking the left mouse button at the cursor; move it somewhere harmless.")
+        time.sleep(1.0)
+        sink = ListenerSink()
+        backend = SystemInput()
+
+    result = measure(backend, sink, samples=args.samples)
+    print(summarize(result))
+    latency = release_latency(result)
+    if args.save and not args.fake and latency is not None:
+        update_settings({"INPUT_LATENCY": round(latency, 4)})
+        print(f"INPUT_LATENCY set to {latency * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import numpy as np
+from classifier import GrayClassifier
+
+MIN_ASPECT = 4 # A bar is at least this many times wider than it is tall
+MIN_FILL = 0.2 # Share of the box that must be fill gray
+MIN_DOT_ROWS = 0.5 # Share of the box rows the dot must show up in
+MAX_CRIT = 0.35 # Largest share of the box the critical zone may take up (about 0.14 in game)
+EDGE_ROWS = 2 # Rows checked just above and below the box
+MAX_EDGE = 0.5 # Largest share of bar grays allowed in those rows; the bar has to stand out
+
+def runs(flags):
+    """Return every run of True values as (start, end) pairs (end exclusive)."""
+    padded = np.concatenate(([0], flags.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+def longest_run(flags):
+    """Return (start, end) of the longest run of True values (end exclusive), or None."""
+    found = runs(flags)
+    return max(found, key=lambda run: run[1] - run[0]) if found else None
+
+def locate_bar(gray, settings, scale=4, min_width=60):
+    """Find the mining bar in a full-screen gray capture.
+
+    A strided (zero-copy) view at 1/scale resolution is searched for rows
+    crossing the bar: unbroken runs of bar grays at least min_width long
+    that hold both fill and critical gray. Runs in neighbouring rows that
+    overlap by min_width are grouped, and every group is refined at full resolution to
+    the tight inside of the bar and kept only if it looks like one (see
+    is_bar); the largest survivor wins. Returns an ROI dict in
+    screen-capture coordinates or None when no bar is visible.
+    """
+    classifier = GrayClassifier(settings)
+    dot, fill, crit = classifier.table.astype(bool)
+    bar = dot | fill | crit
+
+    coarse = gray[::scale, ::scale]
+    # All rows in one flat pass; the masked padding column keeps runs from wrapping into the next row
+    stride = coarse.shape[1] + 1
+    padded = np.zeros((coarse.shape[0], stride), dtype=np.uint8)
+    padded[:, :-1] = coarse
+    flat = padded.ravel()
+    inside = np.arange(flat.size) % stride < stride - 1
+    found = np.array(runs(bar[flat] & inside), dtype=np.int64).reshape(-1, 2)
+    found = found[found[:, 1] - found[:, 0] >= min_width // scale]
+    for lut in (fill, crit):
+        seen = np.concatenate(([0], np.cumsum(lut[flat] & inside)))
+        found = found[seen[found[:, 1]] > seen[found[:, 0]]]
+
+    # Columns shared by every run of a group, so a run bridging the bar and
+    # a neighbouring block of the same gray extends both without merging them
+    groups = [] # (top, bottom, left, right) in coarse cells
+    for start, end in found.tolist():
+        row = start // stride
+        left, right = start - row * stride, end - row * stride
+        joined = False
+        for index, (top, bottom, g_left, g_right) in enumerate(groups):
+            if bottom == row and min(right, g_right) - max(left, g_left) >= min_width // scale:
+                groups[index] = (top, row + 1, max(left, g_left), min(right, g_right))
+                joined = True
+        if not joined:
+            groups.append((row, row + 1, left, right))
+
+    best = None
+    for group in groups:
+        box = refine(gray, bar, group, scale)
+        if box is None or not is_bar(gray, box, (dot, fill, crit), min_width):
+            continue
+        if best is None or box["width"] * box["height"] > best["width"] * best["height"]:
+            best = box
+    return best
+
+def refine(gray, bar, group, scale):
+    """Tight full-resolution box of the bar inside a coarse (top, bottom, left, right) group, or None."""
+    # Refine inside the coarse box grown by one coarse cell
+    top = max(0, (group[0] - 1) * scale)
+    bottom = min(gray.shape[0], (group[1] + 1) * scale)
+    left = max(0, (group[2] - 1) * scale)
+    right = min(gray.shape[1], (group[3] + 1) * scale)
+    window = bar[gray[top:bottom, left:right]]
+    full_cols = longest_run(window.mean(axis=0) >= 0.5)
+    if full_cols is None:
+        return None
+    span = window[:, full_cols[0]:full_cols[1]]
+    full_rows = longest_run(span.mean(axis=1) >= 0.9)
+    if full_rows is None:
+        return None
+    return {
+        "x": left + full_cols[0],
+        "y": top + full_rows[0],
+        "width": full_cols[1] - full_cols[0],
+        "height": full_rows[1] - full_rows[0],
+    }
+
+def is_bar(gray, box, luts, min_width):
+    """Whether a refined box is a wide, flat strip with fill, critical zone and dot that stands out from its surroundings."""
+    dot, fill, crit = luts
+    x, y, width, height = box["x"], box["y"], box["width"], box["height"]
+    if width < min_width or width < MIN_ASPECT * height:
+        return False
+    inside = gray[y:y + height, x:x + width]
+    crit_share = crit[inside].mean()
+    if fill[inside].mean() < MIN_FILL or not 0 < crit_share <= MAX_CRIT or dot[inside].any(axis=1).mean() < MIN_DOT_ROWS:
+        return False
+    bar = dot | fill | crit
+    above = gray[max(0, y - EDGE_ROWS):y, x:x + width]
+    below = gray[y + height:y + height + EDGE_ROWS, x:x + width]
+    return all(edge.size == 0 or bar[edge].mean() <= MAX_EDGE for edge in (above, below))
@@ -0,0 +1,79 @@
+import itertools
+import time
+from collections import deque
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "STATS": 20, "ACTION": 20, "WARN": 30, "ERROR": 40}
+DEFAULT_LEVEL = "INFO"
+
+def parse_level(message):
+    """Level named by a leading "[LEVEL]" tag, INFO for untagged lines.
+
+    One leading non-level tag (the "[profile]" prefix of DetectorGroup) is skipped.
+    """
+    for _ in range(2):
+        if not message.startswith("["):
+            break
+        end = message.find("]")
+        tag = message[1:end]
+        if tag in LEVELS:
+            return tag
+        message = message[end + 1:].lstrip()
+    return DEFAULT_LEVEL
+
+class LogBuffer:
+    """Ring buffer of (time, level, message) records between worker threads and the GUI.
+
+    push() takes a sequence number from an itertools.count and appends to a
+    bounded deque; both are thread-safe in CPython without a lock, so
+    detector threads never take a lock, touch Qt or block on stdout. The GUI
+    thread calls drain() on a timer and renders whatever arrived as a batch.
+    When the GUI falls behind, the oldest records are overwritten; drain()
+    counts them from the gaps in the sequence numbers it sees, and
+    new_drops() tells the GUI how many it missed since it last asked.
+    """
+
+    def __init__(self, capacity=4096, level=DEFAULT_LEVEL):
+        self.records = deque(maxlen=capacity)
+        self.capacity = capacity
+        self.dropped = 0
+        self._sequence = itertools.count()
+        self._next = 0 # Sequence number the next drained record should have
+        self._unreported = 0
+        self.set_level(level)
+
+    def set_level(self, level):
+        self.level = level if level in LEVELS else DEFAULT_LEVEL
+        self.threshold = LEVELS[self.level]
+
+    def push(self, message):
+        level = parse_level(message)
+        if LEVELS[level] < self.threshold:
+            return
+        self.records.append((next(self._sequence), time.time(), level, message))
+
+    def new_drops(self):
+        """Records overwritten since the last call."""
+        new, self._unreported = self._unreported, 0
+        return new
+
+    def drain(self, limit=None):
+        """Pop up to `limit` records (all if None) in arrival order."""
+        batch = []
+        records = self.records
+        expected = self._next
+        while records and (limit is None or len(batch) < limit):
+            try:
+                seq, timestamp, level, message = records.popleft()
+            except IndexError:
+                break
+            if seq >= expected:
+                self.dropped += seq - expected
+                self._unreported += seq - expected
+                expected = seq + 1
+            else:
+                # Another thread appended a later number first, so this one was counted as a gap
+                self.dropped -= 1
+                self._unreported = max(0, self._unreported - 1)
+            batch.append((timestamp, level, message))
+        self._next = expected
+        return batch
@@ -1,11 +1,17 @@
 import sys
+import multiprocessing
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
 from gui_roi_setter import ROISetter
 
 def main():
+    # The capture process is spawned from the frozen exe, which must not start the GUI again
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = ROISetter()
     window.show()
+    # Heavy imports and input listeners load after the first paint
+    QTimer.singleShot(0, window.warm_up)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+ALPHA = 0.5 # Share of each position residual the tracker trusts
+BETA = 0.2 # Share of each residual (per second) fed into the tracker's velocity
+MIN_SAMPLES = 3 # Dot positions needed before the velocity is used
+
+class DotTracker:
+    """Follows the dot center and the critical zone across frames.
+
+    The dot is tracked with an alpha-beta filter: each new position corrects
+    the predicted position by ALPHA of the residual and the velocity (in
+    columns per second) by BETA of it, so an update is a few scalar
+    operations. The zone is the widest extent seen, since the dot hides part
+    of the zone while passing over it.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.timestamp = None
+        self.samples = 0
+        self.zone = None
+        self._velocity = None
+
+    def update(self, timestamp, dot_x, zone):
+        if zone is not None and (self.zone is None or zone[1] - zone[0] > self.zone[1] - self.zone[0]):
+            self.zone = zone
+        if dot_x is None:
+            return
+        if self.x is None:
+            self.x, self.timestamp, self.samples = dot_x, timestamp, 1
+            return
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            return
+        if self._velocity is None:
+            self._velocity = (dot_x - self.x) / dt
+            self.x = dot_x
+        else:
+            predicted = self.x + self._velocity * dt
+            residual = dot_x - predicted
+            self.x = predicted + ALPHA * residual
+            self._velocity += BETA * residual / dt
+        self.timestamp = timestamp
+        self.samples += 1
+
+    @property
+    def zone_center(self):
+        return None if self.zone is None else (self.zone[0] + self.zone[1]) / 2
+
+    def velocity(self):
+        """Dot velocity in columns per second, or None with too few samples."""
+        return self._velocity if self.samples >= MIN_SAMPLES else None
+
+    def crossing_time(self):
+        """Time at which the dot center reaches the zone center, or None if it is not heading there."""
+        velocity = self.velocity()
+        if not velocity or self.zone is None:
+            return None
+        eta = (self.zone_center - self.x) / velocity
+        if eta < -(self.zone[1] - self.zone[0] + 1) / 2 / abs(velocity):
+            # Already past the zone
+            return None
+        return self.timestamp + eta
+
+    def time_to_zone(self):
+        """Seconds until the dot center reaches the near edge of the zone (0 when inside), or None if unknown."""
+        velocity = self.velocity()
+        if not velocity or self.zone is None:
+            return None
+        if self.zone[0] <= self.x <= self.zone[1]:
+            return 0.0
+        edge = self.zone[0] if velocity > 0 else self.zone[1]
+        eta = (edge - self.x) / velocity
+        return eta if eta >= 0 else None
@@ -0,0 +1,43 @@
+import json
+
+ROI_CONFIG = "roi_config.json"
+DEFAULT_PROFILE = "Default"
+DEFAULT_ROI = {"x": 500, "y": 500, "width": 200, "height": 50}
+
+def load_profiles(path=ROI_CONFIG):
+    """Return {name: roi} from roi_config.json.
+
+    A plain single-ROI file (the original layout) is read as one profile
+    named DEFAULT_PROFILE. Raises if the file is missing or unreadable.
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    if "profiles" in data:
+        return data["profiles"]
+    return {DEFAULT_PROFILE: data}
+
+def load_profile(name=None, path=ROI_CONFIG):
+    """ROI of `name`, or of the first profile when name is None."""
+    profiles = load_profiles(path)
+    if name is None:
+        return next(iter(profiles.values()))
+    return profiles[name]
+
+def save_profiles(profiles, path=ROI_CONFIG):
+    # A lone default profile is written in the original flat layout
+    if list(profiles) == [DEFAULT_PROFILE]:
+        data = profiles[DEFAULT_PROFILE]
+    else:
+        data = {"profiles": profiles}
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+def update_profile(name, roi, path=ROI_CONFIG):
+    try:
+        profiles = load_profiles(path)
+    except Exception:
+        profiles = {}
+    if name is None:
+        name = next(iter(profiles), DEFAULT_PROFILE)
+    profiles[name] = roi
+    save_profiles(profiles, path)
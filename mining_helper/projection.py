@@ -0,0 +1,51 @@
+import math
+import numpy as np
+from classifier import GrayClassifier
+
+def row_scores(gray, settings):
+    """Score each ROI row by how much of it matches the dot, fill or critical gray."""
+    table = GrayClassifier(settings).table.any(axis=0)
+    return np.count_nonzero(table[gray], axis=1) / gray.shape[1]
+
+def select_rows(gray, settings, count):
+    """Pick the `count` contiguous rows that carry the most bar information.
+
+    Contiguous rows keep the capture a single rectangle, so only those rows
+    are grabbed from the screen. Returns a list of row offsets inside the
+    ROI, or None when no row shows any part of the bar.
+    """
+    count = max(1, min(count, gray.shape[0]))
+    scores = row_scores(gray, settings)
+    if not scores.any():
+        return None
+    window = np.convolve(scores, np.ones(count), mode="valid")
+    start = int(np.argmax(window))
+    return list(range(start, start + count))
+
+def center_rows(height, count):
+    count = max(1, min(count, height))
+    start = (height - count) // 2
+    return list(range(start, start + count))
+
+def band_roi(roi, count):
+    """Shrink an ROI to the saved (or centered) `count` rows for capture."""
+    if count <= 0:
+        return dict(roi)
+    rows = roi.get("rows") or []
+    if len(rows) > count:
+        # Saved with a larger ROW_SAMPLES; keep the middle of the saved band
+        rows = rows[(len(rows) - count) // 2:][:count]
+    elif len(rows) < count:
+        rows = center_rows(roi["height"], count)
+    return {**roi, "y": roi["y"] + rows[0], "height": len(rows)}
+
+def effective_stride(roi, settings):
+    """Spatial stride for the captured ROI: SAMPLE_STRIDE, raised if needed to fit PIXEL_BUDGET."""
+    stride = max(1, settings["SAMPLE_STRIDE"])
+    budget = settings["PIXEL_BUDGET"]
+    if budget > 0:
+        stride = max(stride, math.ceil(math.sqrt(roi["width"] * roi["height"] / budget)))
+    return stride
+
+def sampled_pixels(roi, stride):
+    return math.ceil(roi["height"] / stride) * math.ceil(roi["width"] / stride)
@@ -0,0 +1,190 @@
+import os
+import queue
+import struct
+import threading
+import numpy as np
+
+MAGIC = b"MHREC001"
+HEADER = struct.Struct("<8sIIQ") # Magic, height, width, record count (0 while the segment is still being written)
+HEADER_SIZE = 64
+
+def record_dtype(height, width):
+    return np.dtype([("timestamp", "<f8"), ("frame", np.uint8, (height, width))])
+
+class FrameRecorder:
+    """Streams gray ROI frames to disk from a background thread.
+
+    The file is a fixed 64-byte header followed by fixed-size records of
+    (float64 timestamp, height x width uint8 frame), so it can be memory-mapped
+    as one structured array. When the frame size changes mid-session (the ROI
+    was moved or resized) the segment's record count is written into its
+    header and a new header starts a segment for the new size. submit()
+    never blocks: when the queue is full the frame is dropped and counted
+    instead.
+    """
+
+    def __init__(self, path, queue_size=256, chunk_size=32):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.dropped = 0
+        self._shape = None
+        self._segment_at = None
+        self._segment_count = 0
+        self._file = None
+        self._thread = None
+
+    def start(self):
+        self._file = open(self.path, "wb")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, gray, timestamp):
+        try:
+            self.queue.put_nowait((timestamp, gray.copy()))
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        if self.written == 0:
+            os.remove(self.path)
+
+    def _run(self):
+        chunk = []
+        while True:
+            item = self.queue.get()
+            if item is not None:
+                chunk.append(item)
+            # Flush a chunk once it is full or the queue has gone idle
+            if chunk and (item is None or len(chunk) >= self.chunk_size or self.queue.empty()):
+                self._write(chunk)
+                chunk = []
+            if item is None:
+                return
+
+    def _write(self, chunk):
+        start = 0
+        for i in range(1, len(chunk) + 1):
+            if i == len(chunk) or chunk[i][1].shape != chunk[start][1].shape:
+                self._write_run(chunk[start:i])
+                start = i
+        self._file.flush()
+
+    def _write_run(self, frames):
+        shape = frames[0][1].shape
+        if shape != self._shape:
+            self._begin_segment(shape)
+        records = np.empty(len(frames), dtype=record_dtype(*shape))
+        for i, (timestamp, frame) in enumerate(frames):
+            records[i]["timestamp"] = timestamp
+            records[i]["frame"] = frame
+        self._file.write(records.tobytes())
+        self._segment_count += len(records)
+        self.written += len(records)
+
+    def _begin_segment(self, shape):
+        if self._shape is not None:
+            # Seal the finished segment with its record count so readers can find the next one
+            end = self._file.tell()
+            self._file.seek(self._segment_at)
+            self._file.write(HEADER.pack(MAGIC, *self._shape, self._segment_count))
+            self._file.seek(end)
+        self._shape = shape
+        self._segment_at = self._file.tell()
+        self._segment_count = 0
+        self._file.write(HEADER.pack(MAGIC, *shape, 0).ljust(HEADER_SIZE, b"\0"))
+
+class FrameReader:
+    """Lazily reads a FrameRecorder file through memory maps, one per segment.
+
+    Files with a single frame size (all files written before segments
+    existed) have one segment and `frames` is a single (N, H, W) array.
+    Otherwise `frames` is a list of the frames of every segment in order;
+    frame_segments() splits either back into equal-size runs.
+    """
+
+    def __init__(self, path):
+        self.segments = []
+        size = os.path.getsize(path)
+        offset = 0
+        with open(path, "rb") as f:
+            while offset < size:
+                f.seek(offset)
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+                    if not self.segments:
+                        raise ValueError(f"{path} is not a frame recording")
+                    break
+                _, height, width, count = HEADER.unpack(header)
+                dtype = record_dtype(height, width)
+                # An unsealed last segment runs to the end of the file; a trailing partial record (e.g. after a crash) is ignored
+                available = (size - offset - HEADER_SIZE) // dtype.itemsize
+                count = min(count, available) if count else available
+                if count > 0:
+                    self.segments.append(np.memmap(path, dtype=dtype, mode="r", offset=offset + HEADER_SIZE, shape=(count,)))
+                else:
+                    self.segments.append(np.empty(0, dtype=dtype))
+                offset += HEADER_SIZE + count * dtype.itemsize
+                if count == 0:
+                    break
+        if not self.segments:
+            raise ValueError(f"{path} is not a frame recording")
+        self.records = self.segments[0]
+        self.shape = self.records["frame"].shape[1:]
+
+    @property
+    def frames(self):
+        if len(self.segments) == 1:
+            return self.records["frame"]
+        return [frame for segment in self.segments for frame in segment["frame"]]
+
+    @property
+    def timestamps(self):
+        if len(self.segments) == 1:
+            return self.records["timestamp"]
+        return np.concatenate([segment["timestamp"] for segment in self.segments])
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        for segment in self.segments:
+            if index < len(segment):
+                record = segment[index]
+                return record["timestamp"], record["frame"]
+            index -= len(segment)
+        raise IndexError("frame index out of range")
+
+    def __iter__(self):
+        for segment in self.segments:
+            for record in segment:
+                yield record["timestamp"], record["frame"]
+
+def frame_segments(frames):
+    """Split frames into runs of one frame size each, in order.
+
+    Accepts a FrameReader (one still memory-mapped (N, H, W) array per
+    segment), a single (N, H, W) array, or a list such as FrameReader.frames
+    returns for segmented recordings, which is split wherever the frame
+    size changes. Every run can be sliced and stacked with np.asarray.
+    """
+    if isinstance(frames, FrameReader):
+        return [segment["frame"] for segment in frames.segments if len(segment)]
+    if isinstance(frames, np.ndarray):
+        return [frames] if len(frames) else []
+    runs = []
+    start = 0
+    for i in range(1, len(frames) + 1):
+        if i == len(frames) or frames[i].shape != frames[start].shape:
+            runs.append(frames[start:i])
+            start = i
+    return runs
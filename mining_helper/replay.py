@@ -0,0 +1,176 @@
+import argparse
+import time
+import numpy as np
+from capture import CaptureSource
+from clock import VirtualClock
+from config_manager import load_settings
+from constants import DEFAULT_SETTINGS
+from input_backend import RecordingInput
+from recorder import FrameReader
+
+MIN_POLL_INTERVAL = 0.001 # Replay poll period for a POLL_INTERVAL of 0 when the session has a single frame
+
+class ReplayCapture(CaptureSource):
+    """Serves the newest recorded frame whose timestamp is not in the future of `clock`."""
+
+    def __init__(self, frames, timestamps, clock):
+        super().__init__()
+        self.frames = frames
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.clock = clock
+        self.grabs = 0
+
+    def open(self, roi=None):
+        height, width = self.frames[0].shape[:2]
+        super().open(roi or {"x": 0, "y": 0, "width": width, "height": height})
+
+    def grab(self):
+        index = np.searchsorted(self.timestamps, self.clock.now(), side="right") - 1
+        self.grabs += 1
+        return self.frames[max(index, 0)]
+
+def load_session(path):
+    """Load a session as (frames, timestamps, release_time).
+
+    Accepts FrameRecorder files, which stay memory-mapped, or an .npz with
+    `frames`, `timestamps` and an optional `release_time` ground truth.
+    """
+    if not path.lower().endswith(".npz"):
+        reader = FrameReader(path)
+        return reader.frames, reader.timestamps, None
+    with np.load(path) as data:
+        frames = data["frames"]
+        timestamps = data["timestamps"]
+        release_time = float(data["release_time"]) if "release_time" in data else None
+    return frames, timestamps, release_time
+
+def save_session(path, frames, timestamps, release_time=None):
+    extra = {} if release_time is None else {"release_time": release_time}
+    np.savez_compressed(path, frames=frames, timestamps=timestamps, **extra)
+
+def replay(frames, timestamps, settings=None, log_func=None):
+    """Run one mining cycle of the real Detector over recorded frames.
+
+    Time is virtual: polls advance the clock by POLL_INTERVAL and the mouse is
+    replaced by a RecordingInput. The state machine runs on the calling
+    thread, no worker is started. `settings` are applied over
+    DEFAULT_SETTINGS; settings.json is only read when none are given.
+    Returns the Detector so callers can inspect `detector.input.events` and
+    `detector.stats`.
+    """
+    from detector import Detector
+
+    settings = {**DEFAULT_SETTINGS, **settings} if settings else load_settings()
+    if settings["POLL_INTERVAL"] <= 0:
+        # Virtual time only moves when slept on, so "as fast as possible" becomes once per recorded frame
+        gaps = np.diff(timestamps)
+        settings["POLL_INTERVAL"] = float(np.median(gaps)) if len(gaps) else MIN_POLL_INTERVAL
+    clock = VirtualClock(start=float(timestamps[0]))
+    height, width = frames[0].shape[:2]
+    detector = Detector(
+        log_func=log_func or (lambda message: None),
+        capture=ReplayCapture(frames, timestamps, clock),
+        clock=clock,
+        input_backend=RecordingInput(clock),
+        roi={"x": 0, "y": 0, "width": width, "height": height},
+        listen=False,
+        settings=settings,
+    )
+    detector.mouse_pressed = True
+    detector.run_cycle()
+    return detector
+
+def benchmark(frames, timestamps, release_time=None, repeat=5, settings=None):
+    """Replay a session `repeat` times and report throughput, latency and release error."""
+    grabs = 0
+    elapsed = 0.0
+    releases = []
+    latencies = []
+    decides = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        detector = replay(frames, timestamps, settings=settings)
+        elapsed += time.perf_counter() - start
+        grabs += detector.capture.grabs
+        latencies.extend(detector.stats.samples["total"])
+        decides.extend(detector.stats.samples["decide"])
+        releases.append(next(iter(detector.input.times("release")), None))
+
+    release = releases[-1]
+    cycle = detector.history.cycles[-1]
+    result = {
+        "frames": grabs,
+        "fps": grabs / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": tuple(np.percentile(latencies, (50, 95, 99)) * 1000) if latencies else None,
+        "decide_us": float(np.percentile(decides, 50)) * 1e6 if decides else None,
+        "release_time": release,
+        "release_error_ms": None,
+        "offset_px": cycle["offset_px"],
+        "hit": cycle["hit"],
+    }
+    if release is not None and release_time is not None:
+        result["release_error_ms"] = (release - release_time) * 1000
+    return result
+
+def compare(frames, timestamps, release_time=None, strategies=None, repeat=5, settings=None):
+    """Benchmark each release strategy on the same frames. Returns {name: benchmark result}."""
+    from strategies import STRATEGIES
+
+    settings = settings or load_settings()
+    return {
+        name: benchmark(frames, timestamps, release_time, repeat, {**settings, "RELEASE_MODE": name})
+        for name in strategies or STRATEGIES
+    }
+
+def format_result(result):
+    lines = [f"Frames processed : {result['frames']}", f"Throughput       : {result['fps']:.0f} frames/s"]
+    if result["latency_ms"]:
+        lines.append("Frame latency    : {:.3f} / {:.3f} / {:.3f} ms (p50/p95/p99)".format(*result["latency_ms"]))
+    if result["release_time"] is None:
+        lines.append("Release          : none (timed out)")
+    elif result["release_error_ms"] is None:
+        lines.append(f"Release          : at {result['release_time']:.4f}s")
+    else:
+        lines.append(f"Release error    : {result['release_error_ms']:+.2f} ms vs ground truth")
+    return "\n".join(lines)
+
+def format_comparison(results):
+    lines = [f"{'STRATEGY':<22} {'ERROR ms':>9} {'OFFSET px':>10} {'HIT':>4} {'DECIDE us':>10} {'FRAME p50/p99 ms':>17}"]
+    for name, result in results.items():
+        error = "-" if result["release_error_ms"] is None else f"{result['release_error_ms']:+.2f}"
+        if result["release_time"] is None:
+            error = "timeout"
+        offset = "-" if result["offset_px"] is None else f"{result['offset_px']:+.1f}"
+        hit = "-" if result["hit"] is None else ("yes" if result["hit"] else "no")
+        decide = "-" if result["decide_us"] is None else f"{result['decide_us']:.1f}"
+        frame = "-" if result["latency_ms"] is None else "{:.3f}/{:.3f}".format(result["latency_ms"][0], result["latency_ms"][2])
+        lines.append(f"{name:<22} {error:>9} {offset:>10} {hit:>4} {decide:>10} {frame:>17}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded ROI frames through the detector without a screen or mouse.")
+    parser.add_argument("command", choices=["replay", "bench", "compare"])
+    parser.add_argument("session", nargs="?", help=".npz session or frame recording (synthetic bar if omitted)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--strategies", nargs="+", help="release strategies to compare (default: all)")
+    args = parser.parse_args()
+
+    if args.session:
+        frames, timestamps, release_time = load_session(args.session)
+    else:
+        from synthetic import render_session
+        frames, timestamps, release_time = render_session()
+
+    settings = load_settings()
+    if args.command == "replay":
+        detector = replay(frames, timestamps, settings=settings, log_func=print)
+        for action, t in detector.input.events:
+            print(f"[EVENT] {action} at {t:.4f}s")
+        return
+    if args.command == "compare":
+        print(format_comparison(compare(frames, timestamps, release_time, args.strategies, args.repeat, settings)))
+        return
+    print(format_result(benchmark(frames, timestamps, release_time, repeat=args.repeat, settings=settings)))
+
+if __name__ == "__main__":
+    main()
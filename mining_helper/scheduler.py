@@ -0,0 +1,71 @@
+class PollScheduler:
+    """Fixed-rate poll scheduler that targets absolute deadlines.
+
+    Each period ends at start + n * interval rather than "work time + sleep",
+    so the rate does not drift. When a deadline has already passed it is
+    counted as missed and the schedule is re-anchored to now instead of
+    bursting to catch up. With adaptive=True the period stretches to what the
+    machine can actually sustain and shrinks back to `interval` when there
+    is headroom again.
+    """
+
+    def __init__(self, clock, interval, wake=None, adaptive=False, max_interval=None):
+        self.clock = clock
+        self.wake = wake
+        self.target = interval
+        self.interval = interval
+        self.adaptive = adaptive
+        self.max_interval = max_interval if max_interval is not None else max(interval * 4, 0.05)
+        self.reset()
+
+    def reset(self):
+        self.deadline = None
+        self.ticks = 0
+        self.missed = 0
+        self.work_time = None
+        self.interval = self.target
+
+    def start(self):
+        """Anchor the schedule at the current time; the first wait ends one interval from now."""
+        self.reset()
+        self.deadline = self.clock.now() + self.interval
+        self._woke_at = self.clock.now()
+
+    def wait(self):
+        """Block until the next deadline. Returns False if woken early by the wake event."""
+        if self.deadline is None:
+            self.start()
+        now = self.clock.now()
+        self.ticks += 1
+        self._adapt(now - self._woke_at)
+
+        if now > self.deadline:
+            self.missed += 1
+            self.deadline = now
+        on_time = self.clock.sleep_until(self.deadline, self.wake)
+        self._woke_at = self.clock.now()
+        self.deadline += self.interval
+        return on_time
+
+    def retarget(self, interval):
+        """Change the target period, taking effect from the last wake-up rather than the old deadline."""
+        if interval == self.target:
+            return
+        self.target = interval
+        self.interval = interval
+        if self.adaptive and self.work_time is not None:
+            self.interval = min(max(interval, self.work_time * 1.2), max(self.max_interval, interval))
+        if self.deadline is not None:
+            self.deadline = self._woke_at + self.interval
+
+    def _adapt(self, work):
+        # Smoothed per-period work time, only used to pick the period
+        self.work_time = work if self.work_time is None else self.work_time * 0.9 + work * 0.1
+        if not self.adaptive:
+            return
+        sustainable = self.work_time * 1.2
+        self.interval = min(max(self.target, sustainable), max(self.max_interval, self.target))
+
+    def summary(self):
+        return (f"[STATS] Scheduler: {self.ticks} polls, {self.missed} missed deadlines, "
+                f"period {self.interval * 1000:.2f} ms (target {self.target * 1000:.2f} ms)")
@@ -1,8 +1,15 @@
+import threading
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QDoubleSpinBox, QSpinBox,
-    QPushButton, QFormLayout, QMessageBox
+    QPushButton, QFormLayout, QMessageBox, QCheckBox, QComboBox
 )
-from config_manager import load_settings, save_settings, reset_settings
+from config_manager import load_settings, save_settings, update_settings
+from profiles import DEFAULT_ROI, load_profile, load_profiles, save_profiles
+from strategies import ALIASES, STRATEGIES
+
+USE_RELEASE_MODE = "(RELEASE_MODE)"
+CALIBRATION_POLL_MS = 50 # How often the dialog checks whether the calibration thread is done
 
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
@@ -19,33 +26,72 @@ class SettingsDialog(QDialog):
         # Add each editable value
         self.add_spin(form, "DEFAULT_DELAY", 0.0, 1.0, 0.01)
         self.add_spin(form, "POLL_INTERVAL", 0.0, 1.0, 0.001)
+        self.add_check(form, "ADAPTIVE_POLL")
+        self.add_check(form, "PHASE_POLLING")
+        self.add_spin(form, "IDLE_POLL_INTERVAL", 0.0, 1.0, 0.005)
         self.add_spin(form, "RESET_TIMEOUT", 0.1, 10.0, 0.1)
         self.add_spin(form, "RECHECK_GRACE_PERIOD", 0.0, 1.0, 0.01)
-        self.add_spin(form, "MAX_REENGAGE_ATTEMPTS", 1, 10, 1, integer=True)
+        self.add_spin(form, "REENGAGE_TIMEOUT", 0.05, 5.0, 0.05)
         self.add_spin(form, "DOT_GRAY", 0, 255, 1, integer=True)
         self.add_spin(form, "FILL_GRAY", 0, 255, 1, integer=True)
         self.add_spin(form, "CRITICAL_GRAY", 0, 255, 1, integer=True)
         self.add_spin(form, "TOLERANCE", 0, 100, 1, integer=True)
+        self.add_choice(form, "RELEASE_MODE", list(STRATEGIES))
+        self.add_profile_strategy(form)
+        self.add_spin(form, "GATE_RATIO", 0.0, 1.0, 0.001)
+        self.add_spin(form, "DROP_THRESHOLD", 0.0, 1.0, 0.001)
+        self.add_spin(form, "MIN_PEAK", 0.0, 1.0, 0.001)
+        self.add_spin(form, "INPUT_LATENCY", 0.0, 0.2, 0.001)
+        self.add_spin(form, "ROW_SAMPLES", 0, 50, 1, integer=True)
+        self.add_spin(form, "SAMPLE_STRIDE", 1, 16, 1, integer=True)
+        self.add_spin(form, "PIXEL_BUDGET", 0, 1000000, 500, integer=True)
+
+        pixels_row = QHBoxLayout()
+        self.pixels_label = QLabel()
+        measure_btn = QPushButton("Measure")
+        measure_btn.setToolTip("Time per-frame classification at full resolution vs. the current sampling")
+        measure_btn.clicked.connect(self.measure_sampling)
+        pixels_row.addWidget(self.pixels_label)
+        pixels_row.addWidget(measure_btn)
+        form.addRow(QLabel("Pixels per frame"), pixels_row)
+        for key in ("ROW_SAMPLES", "SAMPLE_STRIDE", "PIXEL_BUDGET"):
+            self.fields[key].valueChanged.connect(self.update_pixels_label)
+        self.update_pixels_label()
+        self.add_check(form, "CAPTURE_PROCESS")
+        self.add_check(form, "SKIP_UNCHANGED")
+        self.add_check(form, "AUTO_LOCATE")
+        self.add_spin(form, "STATS_INTERVAL", 0.0, 60.0, 1.0)
+        self.add_choice(form, "LOG_LEVEL", ["DEBUG", "INFO", "WARN", "ERROR"])
 
         layout.addLayout(form)
 
         # Buttons
         btns = QHBoxLayout()
         save_btn = QPushButton("Save")
+        self.calibrate_btn = QPushButton("Calibrate")
+        self.calibrate_btn.setToolTip("Measure the gray values from the mining bar currently on screen")
         reset_btn = QPushButton("Reset to Defaults")
         cancel_btn = QPushButton("Cancel")
 
         save_btn.clicked.connect(self.save)
+        self.calibrate_btn.clicked.connect(self.calibrate)
         reset_btn.clicked.connect(self.reset)
         cancel_btn.clicked.connect(self.reject)
 
         btns.addWidget(save_btn)
+        btns.addWidget(self.calibrate_btn)
         btns.addWidget(reset_btn)
         btns.addWidget(cancel_btn)
         layout.addLayout(btns)
 
         self.setLayout(layout)
 
+        # Calibration grabs frames for half a second, so it runs off the GUI thread
+        self.calibration_thread = None
+        self.calibration_result = None
+        self.calibration_timer = QTimer(self)
+        self.calibration_timer.timeout.connect(self.finish_calibration)
+
     def add_spin(self, layout, key, min_val, max_val, step, integer=False):
         if integer:
             field = QSpinBox()
@@ -59,16 +105,154 @@ class SettingsDialog(QDialog):
         self.fields[key] = field
         layout.addRow(QLabel(key), field)
 
+    def add_check(self, layout, key):
+        field = QCheckBox()
+        field.setChecked(bool(self.current_settings.get(key, False)))
+        self.fields[key] = field
+        layout.addRow(QLabel(key), field)
+
+    def add_choice(self, layout, key, options):
+        field = QComboBox()
+        field.addItems(options)
+        field.setCurrentText(str(self.current_settings.get(key, options[0])))
+        self.fields[key] = field
+        layout.addRow(QLabel(key), field)
+
+    def add_profile_strategy(self, layout):
+        # Stored in the profile rather than settings.json, so it isn't one of self.fields
+        self.strategy_field = QComboBox()
+        self.strategy_field.addItems([USE_RELEASE_MODE] + list(STRATEGIES))
+        strategy = self.load_roi().get("strategy")
+        self.strategy_field.setCurrentText(ALIASES.get(strategy, strategy) or USE_RELEASE_MODE)
+        self.saved_strategy = self.strategy_field.currentText()
+        self.strategy_field.setToolTip("Release strategy for the profile being edited; overrides RELEASE_MODE")
+        layout.addRow(QLabel("PROFILE STRATEGY"), self.strategy_field)
+
+    def save_profile_strategy(self):
+        profile = getattr(self.parent(), "profile", None)
+        strategy = self.strategy_field.currentText()
+        if strategy == self.saved_strategy:
+            return
+        profiles = load_profiles()
+        roi = profiles[profile] if profile in profiles else next(iter(profiles.values()))
+        if strategy == USE_RELEASE_MODE:
+            roi.pop("strategy", None)
+        else:
+            roi["strategy"] = strategy
+        save_profiles(profiles)
+
+    def field_value(self, field):
+        if isinstance(field, QCheckBox):
+            return field.isChecked()
+        if isinstance(field, QComboBox):
+            return field.currentText()
+        return field.value()
+
+    def set_field_value(self, field, value):
+        if isinstance(field, QCheckBox):
+            field.setChecked(value)
+        elif isinstance(field, QComboBox):
+            field.setCurrentText(str(value))
+        else:
+            field.setValue(value)
+
+    def load_roi(self):
+        # The profile being edited in the main window, if there is one
+        profile = getattr(self.parent(), "profile", None)
+        try:
+            return load_profile(profile)
+        except Exception:
+            return dict(DEFAULT_ROI)
+
+    def sampling(self):
+        """(captured ROI, stride) for the values currently in the dialog."""
+        from projection import band_roi, effective_stride
+
+        settings = {key: self.field_value(field) for key, field in self.fields.items()}
+        roi = band_roi(self.load_roi(), settings["ROW_SAMPLES"])
+        return roi, effective_stride(roi, settings)
+
+    def update_pixels_label(self):
+        from projection import sampled_pixels
+
+        roi, stride = self.sampling()
+        full = roi["width"] * roi["height"]
+        self.pixels_label.setText(f"{sampled_pixels(roi, stride)} of {full} (stride {stride})")
+
+    def measure_sampling(self):
+        import time
+        from classifier import GrayClassifier
+        from synthetic import render_session
+
+        roi, stride = self.sampling()
+        frames, _, _ = render_session(width=roi["width"], height=roi["height"], fps=10)
+        gray = frames[len(frames) // 2]
+        classifier = GrayClassifier(self.current_settings)
+        timings = []
+        for view in (gray, gray[::stride, ::stride]):
+            start = time.perf_counter()
+            for _ in range(200):
+                classifier.ratios(view)
+                classifier.locate(view, stride)
+            timings.append((time.perf_counter() - start) / 200 * 1000)
+        QMessageBox.information(
+            self, "Sampling Benchmark",
+            f"Full ROI: {timings[0]:.3f} ms/frame\nStride {stride}: {timings[1]:.3f} ms/frame\n"
+            f"Saved: {timings[0] - timings[1]:.3f} ms per frame"
+        )
+
     def save(self):
-        new_settings = {key: field.value() for key, field in self.fields.items()}
-        save_settings(new_settings)
+        new_settings = {key: self.field_value(field) for key, field in self.fields.items()}
+        update_settings(new_settings)
+        try:
+            self.save_profile_strategy()
+        except Exception as e:
+            QMessageBox.warning(self, "Profile Not Saved", f"Could not save the profile strategy: {e}\nSave an ROI first.")
         QMessageBox.information(self, "Settings Saved", "Settings were saved successfully.")
         self.accept()
 
+    def calibrate(self):
+        from calibration import calibrate, capture_burst
+
+        if self.calibration_thread is not None:
+            return
+        roi = self.load_roi()
+        settings = dict(self.current_settings)
+
+        def run():
+            try:
+                self.calibration_result = (calibrate(capture_burst(roi), settings), None)
+            except Exception as e:
+                self.calibration_result = (None, e)
+
+        self.calibration_result = None
+        self.calibrate_btn.setEnabled(False)
+        self.calibrate_btn.setText("Calibrating...")
+        self.calibration_thread = threading.Thread(target=run, daemon=True)
+        self.calibration_thread.start()
+        self.calibration_timer.start(CALIBRATION_POLL_MS)
+
+    def finish_calibration(self):
+        if self.calibration_result is None:
+            return
+        self.calibration_timer.stop()
+        result, error = self.calibration_result
+        self.calibration_thread = None
+        self.calibrate_btn.setEnabled(True)
+        self.calibrate_btn.setText("Calibrate")
+        if error is not None:
+            QMessageBox.warning(self, "Calibration Failed", f"Could not calibrate: {error}\nMake sure the mining bar is visible inside the saved ROI.")
+            return
+        # Only the fields change; Save keeps the values like any other edit, Cancel discards them
+        for key, val in result.items():
+            self.set_field_value(self.fields[key], val)
+        summary = ", ".join(f"{key}={val}" for key, val in result.items())
+        QMessageBox.information(self, "Calibration Done", f"Calibrated: {summary}\nClick Save to keep these values.")
+
     def reset(self):
         from constants import DEFAULT_SETTINGS
         for key, val in DEFAULT_SETTINGS.items():
             if key in self.fields:
-                self.fields[key].setValue(val)
+                self.set_field_value(self.fields[key], val)
         save_settings(DEFAULT_SETTINGS)
         QMessageBox.information(self, "Settings Reset", "Settings reset to default.")
@@ -0,0 +1,61 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# What the window needs before it can show, and what warm_up() loads afterwards
+MODULES = [
+    "gui_roi_setter", "PyQt5.QtWidgets", "config_manager", "controller",
+    "detector", "numpy", "cv2", "mss", "pynput",
+]
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def import_times(module):
+    """Import `module` in a fresh interpreter with -X importtime.
+
+    Returns {name: (self_us, cumulative_us)} for every module it loaded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+def measure(module, repeat=3):
+    """Best-of-`repeat` cumulative import time of `module` in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        cumulative = import_times(module)[module][1] / 1000
+        best = cumulative if best is None else min(best, cumulative)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-module import cost at startup.")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest modules loaded by the first one")
+    args = parser.parse_args()
+
+    print(f"{'MODULE':<20} {'IMPORT ms':>10}")
+    for module in args.modules:
+        try:
+            print(f"{module:<20} {measure(module, args.repeat):>10.1f}")
+        except ImportError as e:
+            print(f"{module:<20} {'failed':>10}  {e}")
+
+    if args.top:
+        times = import_times(args.modules[0])
+        print(f"\nSlowest modules under {args.modules[0]} (self time):")
+        for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: -item[1][0])[:args.top]:
+            print(f"{name:<40} {self_us / 1000:>8.1f} ms  (cumulative {cumulative_us / 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
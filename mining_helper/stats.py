@@ -0,0 +1,121 @@
+import csv
+import json
+import time
+from collections import deque
+import numpy as np
+
+STAGES = ("capture", "convert", "classify", "decide", "input")
+
+class LatencyStats:
+    """Per-stage frame timings with rolling percentiles and achieved FPS.
+
+    Call begin_frame() right before the grab, mark(stage) after each stage
+    and end_frame() when the frame is done. Stages that did not run for a
+    frame (e.g. input when nothing was released) are simply left out.
+    Frames marked unchanged() skipped conversion and classification and are
+    counted separately.
+    """
+
+    def __init__(self, window=1000, max_records=100000):
+        self.window = window
+        self.samples = {stage: deque(maxlen=window) for stage in STAGES + ("total",)}
+        self.frame_times = deque(maxlen=window)
+        self.records = deque(maxlen=max_records)
+        self.last_report = time.perf_counter()
+        self._start = None
+        self._last = None
+        self._skipped = 0.0
+        self._current = {}
+        self._unchanged = False
+        self.frames = 0
+        self.unchanged_frames = 0
+
+    def begin_frame(self):
+        self._start = self._last = time.perf_counter()
+        self._skipped = 0.0
+        self._current = {}
+        self._unchanged = False
+
+    def unchanged(self):
+        """Flag the current frame as identical to the previous one."""
+        self._unchanged = True
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self._current[stage] = now - self._last
+        self._last = now
+
+    def skip(self):
+        """Leave the time since the last mark out of every stage and the total (e.g. a deliberate wait)."""
+        now = time.perf_counter()
+        self._skipped += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        if self._start is None:
+            return
+        total = self._last - self._start - self._skipped
+        for stage, duration in self._current.items():
+            self.samples[stage].append(duration)
+        self.samples["total"].append(total)
+        self.frame_times.append(self._start)
+        self.records.append({"timestamp": self._start, "total": total, "unchanged": int(self._unchanged), **self._current})
+        self.frames += 1
+        self.unchanged_frames += self._unchanged
+        self._start = None
+
+    def percentiles(self, stage):
+        """Return (p50, p95, p99) in seconds, or None when there are no samples."""
+        values = self.samples[stage]
+        if not values:
+            return None
+        return tuple(np.percentile(np.fromiter(values, dtype=np.float64), (50, 95, 99)))
+
+    def fps(self):
+        if len(self.frame_times) < 2:
+            return 0.0
+        span = self.frame_times[-1] - self.frame_times[0]
+        return (len(self.frame_times) - 1) / span if span > 0 else 0.0
+
+    def summary(self, poll_interval=None):
+        fps = f"{self.fps():.1f} fps"
+        if poll_interval:
+            fps += f" (target {1 / poll_interval:.0f})"
+        parts = [fps]
+        for stage in STAGES + ("total",):
+            p = self.percentiles(stage)
+            if p is not None:
+                parts.append(f"{stage} {p[0] * 1000:.2f}/{p[1] * 1000:.2f}/{p[2] * 1000:.2f}")
+        summary = "[STATS] " + ", ".join(parts) + " ms (p50/p95/p99)"
+        if self.unchanged_frames:
+            summary += f", {self.unchanged_frames}/{self.frames} frames unchanged and skipped"
+        return summary
+
+    def maybe_report(self, log_func, interval, poll_interval=None):
+        """Push a summary through log_func at most once every interval seconds."""
+        if interval <= 0 or not self.samples["total"]:
+            return
+        now = time.perf_counter()
+        if now - self.last_report >= interval:
+            self.last_report = now
+            log_func(self.summary(poll_interval))
+
+    def export(self, path):
+        """Write the raw per-frame samples to .json, or to .csv for any other extension."""
+        records = list(self.records)
+        if path.lower().endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({"stages": list(STAGES), "frames": records}, f, indent=4)
+            return
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["timestamp", *STAGES, "total", "unchanged"])
+            writer.writeheader()
+            writer.writerows(records)
+
+    def reset(self):
+        for values in self.samples.values():
+            values.clear()
+        self.frame_times.clear()
+        self.records.clear()
+        self.frames = 0
+        self.unchanged_frames = 0
@@ -0,0 +1,164 @@
+from prediction import DotTracker
+
+class ReleaseStrategy:
+    """Decides when to let go of the mouse while a bar is being polled.
+
+    update() is called with every newly classified frame and decide() on
+    every poll, including polls of unchanged frames. Both only touch a few
+    scalars, so the cost per frame is constant however long the cycle runs.
+    decide() returns None to keep holding, or (release_at, message) where
+    release_at may lie in the future; `deadline` is when the next poll
+    happens. Strategies with `tracks_dot` need the dot position and the
+    critical-zone extent of every frame; any positions given are followed
+    by `tracker`.
+    """
+
+    name = None
+    tracks_dot = False
+
+    def __init__(self, settings):
+        # The detector also reads the dot's velocity and the zone from here
+        self.tracker = DotTracker()
+        self.configure(settings)
+        self.reset()
+
+    def configure(self, settings):
+        pass
+
+    def reset(self):
+        self.timestamp = None
+        self.dot_x = None
+        self.tracker.reset()
+
+    def update(self, timestamp, ratios, dot_x=None, zone=None):
+        self.timestamp = timestamp
+        self.dot_x = dot_x
+        self.tracker.update(timestamp, dot_x, zone)
+
+    def decide(self, now, deadline):
+        raise NotImplementedError
+
+    @property
+    def zone(self):
+        return self.tracker.zone
+
+    @property
+    def zone_center(self):
+        return self.tracker.zone_center
+
+class PeakDropStrategy(ReleaseStrategy):
+    """Releases once critical-zone coverage drops DROP_THRESHOLD below its peak.
+
+    The dot covering the zone is what lowers the coverage, so the drop only
+    counts while both dot and fill are above GATE_RATIO and the peak itself
+    is above MIN_PEAK.
+    """
+
+    name = "peak_drop"
+
+    def configure(self, settings):
+        self.gate = settings["GATE_RATIO"]
+        self.drop = settings["DROP_THRESHOLD"]
+        self.min_peak = settings["MIN_PEAK"]
+
+    def reset(self):
+        super().reset()
+        self.peak = 0.0
+        self.ratios = (0.0, 0.0, 0.0)
+
+    def update(self, timestamp, ratios, dot_x=None, zone=None):
+        super().update(timestamp, ratios, dot_x, zone)
+        self.ratios = ratios
+        self.peak = max(self.peak, ratios[2])
+
+    def decide(self, now, deadline):
+        dot, fill, crit = self.ratios
+        if dot > self.gate and fill > self.gate and self.peak > self.min_peak and self.peak - crit >= self.drop:
+            return now, f"[ACTION] Critical drop from peak: {self.peak:.2%} → {crit:.2%}"
+        return None
+
+class ZoneEntryStrategy(ReleaseStrategy):
+    """Releases on the first frame with the dot center inside the critical zone.
+
+    The earliest release that still lands in the zone, so it holds up best
+    on slow polls. A dot that jumped over the whole zone between two polls
+    is released as soon as it is seen past it.
+    """
+
+    name = "zone_entry"
+    tracks_dot = True
+
+    def reset(self):
+        super().reset()
+        self.side = None
+
+    def update(self, timestamp, ratios, dot_x=None, zone=None):
+        super().update(timestamp, ratios, dot_x, zone)
+        center = self.zone_center
+        if self.side is None and dot_x is not None and center is not None and dot_x != center:
+            # Which side of the zone the dot started on gives its direction
+            self.side = 1 if dot_x < center else -1
+
+    def passed(self, mark):
+        return self.side is not None and (mark - self.dot_x) * self.side <= 0
+
+    def decide(self, now, deadline):
+        if self.dot_x is None or self.zone is None:
+            return None
+        if self.zone[0] <= self.dot_x <= self.zone[1] or self.passed(self.zone_center):
+            return now, f"[ACTION] Dot entered the critical zone at column {self.dot_x:.0f} ({self.zone[0]}-{self.zone[1]})"
+        return None
+
+class ZoneCenterStrategy(ZoneEntryStrategy):
+    """Releases on the first frame where the dot center has reached the zone center.
+
+    Purely reactive: on average it lands half a poll interval past the
+    center, which is still a hit as long as the poll interval is short
+    compared to the time the dot spends in the zone.
+    """
+
+    name = "zone_center"
+
+    def decide(self, now, deadline):
+        if self.dot_x is None or self.zone is None or not self.passed(self.zone_center):
+            return None
+        return now, f"[ACTION] Dot reached the zone center at column {self.dot_x:.0f} (center {self.zone_center:.0f})"
+
+class VelocityCompensatedStrategy(ZoneCenterStrategy):
+    """Releases early at the predicted zone-center crossing, minus INPUT_LATENCY.
+
+    The crossing comes from the dot tracker's position and velocity, and the
+    release is only committed when the next poll would come too late to
+    catch it. Until the tracker has an estimate it acts as zone_center, so
+    a dot that is still approaching the zone is never released early.
+    """
+
+    name = "velocity_compensated"
+
+    def configure(self, settings):
+        self.input_latency = settings["INPUT_LATENCY"]
+
+    def release_time(self):
+        """Predicted release time, or None without an estimate or once the dot is past the zone."""
+        crossing = self.tracker.crossing_time()
+        return None if crossing is None else crossing - self.input_latency
+
+    def decide(self, now, deadline):
+        release_at = self.release_time()
+        if release_at is None:
+            return super().decide(now, deadline)
+        # Only commit when the next poll would come too late to catch it
+        if release_at >= deadline:
+            return None
+        ahead = (release_at - self.tracker.timestamp) * 1000
+        return release_at, f"[ACTION] Predicted zone-center crossing, released {ahead:.1f} ms after frame"
+
+STRATEGIES = {cls.name: cls for cls in (PeakDropStrategy, ZoneEntryStrategy, ZoneCenterStrategy, VelocityCompensatedStrategy)}
+ALIASES = {"predictive": VelocityCompensatedStrategy.name} # Older settings files
+
+def make_strategy(name, settings):
+    """Build the strategy called `name`. Raises ValueError for unknown names."""
+    name = ALIASES.get(name, name)
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown release strategy: {name}")
+    return STRATEGIES[name](settings)
@@ -0,0 +1,197 @@
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from classifier import GrayClassifier
+from config_manager import load_settings
+from cycle_history import CycleHistory, widest_zone
+from recorder import frame_segments
+
+PARALLEL_THRESHOLD = 64 # Grids smaller than this are not worth starting a process pool for
+
+def frame_histograms(frames, chunk=256):
+    """Return an (N, 256) array with the gray histogram of every frame.
+
+    Recordings change frame size between segments, so every segment is
+    histogrammed on its own, a chunk at a time.
+    """
+    hists = np.empty((len(frames), 256), dtype=np.int32)
+    done = 0
+    for segment in frame_segments(frames):
+        for start in range(0, len(segment), chunk):
+            block = np.asarray(segment[start:start + chunk])
+            block = block.reshape(len(block), -1)
+            # Offset each frame into its own 256-bin range so one bincount covers the block
+            offsets = (np.arange(len(block), dtype=np.int64) * 256)[:, None]
+            counts = np.bincount((block + offsets).ravel(), minlength=len(block) * 256)
+            hists[done:done + len(block)] = counts.reshape(-1, 256)
+            done += len(block)
+    return hists
+
+def band_ratios(hists, settings, tolerance):
+    """(N, 3) dot/fill/critical ratios for every frame at the given tolerance."""
+    cumulative = np.concatenate((np.zeros((len(hists), 1), dtype=np.int64), np.cumsum(hists, axis=1)), axis=1)
+    size = cumulative[:, -1].astype(np.float64)
+    ratios = np.empty((len(hists), 3))
+    for i, key in enumerate(("DOT_GRAY", "FILL_GRAY", "CRITICAL_GRAY")):
+        lo = max(0, settings[key] - tolerance)
+        hi = min(255, settings[key] + tolerance)
+        ratios[:, i] = (cumulative[:, hi + 1] - cumulative[:, lo]) / size
+    return ratios
+
+def simulate(ratios, timestamps, params):
+    """Replay the peak_drop strategy on precomputed ratios for one parameter set.
+
+    Polls are taken every POLL_INTERVAL after DEFAULT_DELAY, each seeing the
+    newest frame at that time. Returns the release time, or None on timeout.
+    """
+    start = timestamps[0] + params["DEFAULT_DELAY"]
+    end = min(timestamps[-1], start + params["RESET_TIMEOUT"])
+    poll_times = np.arange(start, end + 1e-9, max(params["POLL_INTERVAL"], 1e-4))
+    if poll_times.size == 0:
+        return None
+    index = np.searchsorted(timestamps, poll_times, side="right") - 1
+    dot, fill, crit = ratios[index].T
+    peak = np.maximum.accumulate(crit)
+    gate = params["GATE_RATIO"]
+    fire = (dot > gate) & (fill > gate) & (peak - crit >= params["DROP_THRESHOLD"]) & (peak > params["MIN_PEAK"])
+    hits = np.flatnonzero(fire)
+    return float(poll_times[hits[0]]) if hits.size else None
+
+def locate_frames(frames, settings, tolerance):
+    """(dot_x, widest zone so far, dot_width) of every frame at the given tolerance."""
+    classifier = GrayClassifier({**settings, "TOLERANCE": tolerance})
+    located = []
+    zone = None
+    for segment in frame_segments(frames):
+        for gray in segment:
+            dot_x, seen = classifier.locate(gray)
+            zone = widest_zone(zone, seen)
+            located.append((dot_x, zone, classifier.dot_width))
+    return located
+
+def _simulate_chunk(ratios, timestamps, chunk):
+    return [simulate(ratios, timestamps, params) for params in chunk]
+
+def expand_grid(grid, settings):
+    """Turn {"TOLERANCE": [3, 5], ...} into a list of full parameter dicts."""
+    base = {
+        "TOLERANCE": settings["TOLERANCE"],
+        "DROP_THRESHOLD": settings["DROP_THRESHOLD"],
+        "GATE_RATIO": settings["GATE_RATIO"],
+        "MIN_PEAK": settings["MIN_PEAK"],
+        "POLL_INTERVAL": settings["POLL_INTERVAL"],
+        "DEFAULT_DELAY": settings["DEFAULT_DELAY"],
+        "RESET_TIMEOUT": settings["RESET_TIMEOUT"],
+    }
+    keys = list(grid)
+    return [{**base, **dict(zip(keys, values))} for values in itertools.product(*(grid[k] for k in keys))]
+
+def evaluate_grid(frames, timestamps, grid, release_time=None, settings=None, processes=None):
+    """Evaluate every parameter combination in `grid` against one recorded session.
+
+    `frames` is an (N, H, W) uint8 stack or a segmented recording's frame
+    list (see recorder.frame_segments). Histograms are computed once for all
+    frames and ratios once per distinct tolerance; the per-configuration
+    decision simulation is spread over a process pool for large grids.
+    Returns one row dict per configuration with the release time, the dot's
+    offset from the zone center in the frame shown at release and whether
+    that is a hit under CycleHistory's rule (any part of the dot over the
+    zone), plus the timing error given a ground-truth release_time.
+    """
+    settings = settings or load_settings()
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    configs = expand_grid(grid, settings)
+    hists = frame_histograms(frames)
+
+    by_tolerance = {}
+    for config in configs:
+        by_tolerance.setdefault(config["TOLERANCE"], []).append(config)
+
+    releases = {}
+    located = {}
+    workers = processes or os.cpu_count() or 1
+    parallel = workers > 1 and len(configs) >= PARALLEL_THRESHOLD
+    executor = ProcessPoolExecutor(max_workers=workers) if parallel else None
+    try:
+        for tolerance, group in by_tolerance.items():
+            ratios = band_ratios(hists, settings, tolerance)
+            if executor is None:
+                results = _simulate_chunk(ratios, timestamps, group)
+            else:
+                size = max(1, len(group) // (workers * 4))
+                chunks = [group[i:i + size] for i in range(0, len(group), size)]
+                futures = [executor.submit(_simulate_chunk, ratios, timestamps, chunk) for chunk in chunks]
+                results = [r for future in futures for r in future.result()]
+            for config, release in zip(group, results):
+                releases[id(config)] = release
+            if any(release is not None for release in results):
+                located[tolerance] = locate_frames(frames, settings, tolerance)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    rows = []
+    history = CycleHistory(capacity=1, max_frames=1)
+    for config in configs:
+        release = releases[id(config)]
+        row = {**config, "release_time": release, "error_ms": None, "offset_px": None, "hit": None}
+        if release is not None:
+            # Judged on the frame on screen at release, like a live cycle
+            index = max(int(np.searchsorted(timestamps, release, side="right")) - 1, 0)
+            history.begin(timestamps[0])
+            history.released(release, *located[config["TOLERANCE"]][index])
+            cycle = history.end()
+            row["offset_px"], row["hit"] = cycle["offset_px"], cycle["hit"]
+            if release_time is not None:
+                row["error_ms"] = (release - release_time) * 1000
+        rows.append(row)
+    return rows
+
+def format_rows(rows):
+    lines = [f"{'TOL':>4} {'DROP':>7} {'POLL':>7} {'RELEASE':>9} {'ERROR ms':>9} {'OFFSET px':>10} HIT"]
+    for row in rows:
+        release = "timeout" if row["release_time"] is None else f"{row['release_time']:.4f}"
+        error = "-" if row["error_ms"] is None else f"{row['error_ms']:+.2f}"
+        offset = "-" if row["offset_px"] is None else f"{row['offset_px']:+.1f}"
+        hit = "-" if row["hit"] is None else ("yes" if row["hit"] else "no")
+        lines.append(f"{row['TOLERANCE']:>4} {row['DROP_THRESHOLD']:>7.4f} {row['POLL_INTERVAL']:>7.4f} {release:>9} {error:>9} {offset:>10} {hit:>3}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep detection parameters over a recorded session.")
+    parser.add_argument("session", nargs="?", help=".npz session or frame recording (synthetic bar if omitted)")
+    parser.add_argument("--tolerance", type=int, nargs="+")
+    parser.add_argument("--drop", type=float, nargs="+", default=[0.0025, 0.005, 0.01])
+    parser.add_argument("--poll", type=float, nargs="+", default=[0.005, 0.01, 0.02, 0.03])
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--csv", help="also write the full table to this CSV file")
+    args = parser.parse_args()
+
+    if args.session:
+        from replay import load_session
+        frames, timestamps, release_time = load_session(args.session)
+    else:
+        from synthetic import render_session
+        frames, timestamps, release_time = render_session()
+
+    settings = load_settings()
+    grid = {
+        "TOLERANCE": args.tolerance or [settings["TOLERANCE"]],
+        "DROP_THRESHOLD": args.drop,
+        "POLL_INTERVAL": args.poll,
+    }
+    rows = evaluate_grid(frames, timestamps, grid, release_time, settings=settings, processes=args.processes)
+    if release_time is not None:
+        rows.sort(key=lambda row: float("inf") if row["error_ms"] is None else abs(row["error_ms"]))
+    print(format_rows(rows))
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import argparse
+import numpy as np
+from capture import CaptureSource
+from constants import DEFAULT_SETTINGS
+
+CHUNK = 256 # Frames rendered per vectorized batch
+
+def _px(value, width):
+    return int(round(value * width)) if isinstance(value, float) and value <= 1.0 else int(value)
+
+class SyntheticBar:
+    """Geometry, motion and look of one rendered mining bar.
+
+    Sizes given as floats in [0, 1] are fractions of the bar width, anything
+    else is pixels. The dot starts at one end (the left for direction=1, the
+    right for direction=-1) and moves at `speed` px/s. `scale` resizes the
+    whole bar, speed included, as a HiDPI display would, so crossing times
+    don't change. The look is degraded in display order: `gamma` remaps the
+    gray levels, `blur` is a horizontal box blur radius in pixels and
+    `noise` the standard deviation of per-pixel gray noise.
+    """
+
+    def __init__(self, width=502, height=14, zone_start=0.7, zone_width=0.14, dot_width=0.05,
+                 speed=400.0, direction=1, noise=0.0, gamma=1.0, blur=0, scale=1.0, seed=None,
+                 settings=DEFAULT_SETTINGS):
+        self.width = int(round(width * scale))
+        self.height = int(round(height * scale))
+        self.zone_start = int(round(_px(zone_start, width) * scale))
+        self.zone_width = max(1, int(round(_px(zone_width, width) * scale)))
+        self.dot_width = max(1, int(round(_px(dot_width, width) * scale)))
+        self.speed = speed * scale
+        self.direction = 1 if direction >= 0 else -1
+        self.noise = noise
+        self.blur = int(round(blur * scale))
+        self.dot_gray = settings["DOT_GRAY"]
+        self.rng = np.random.default_rng(seed)
+
+        self.lut = None
+        if gamma != 1.0:
+            levels = np.arange(256) / 255.0
+            self.lut = np.round(255 * levels ** gamma).astype(np.uint8)
+        self.base_row = np.full(self.width, settings["FILL_GRAY"], dtype=np.uint8)
+        self.base_row[self.zone_start:self.zone_start + self.zone_width] = settings["CRITICAL_GRAY"]
+        self._cols = np.arange(self.width)
+
+    @property
+    def travel(self):
+        return self.width - self.dot_width
+
+    @property
+    def duration(self):
+        """Time for the dot to cross the whole bar."""
+        return self.travel / self.speed
+
+    @property
+    def plain(self):
+        """True when frames are just the gray levels, with no look degradation."""
+        return self.lut is None and self.blur <= 0 and self.noise <= 0
+
+    def dot_left(self, times):
+        start = 0.0 if self.direction > 0 else self.travel
+        return np.clip(start + self.direction * self.speed * np.asarray(times, dtype=np.float64), 0, self.travel)
+
+    def crossing_time(self):
+        """Exact time at which the dot center crosses the critical-zone center."""
+        zone_center = self.zone_start + self.zone_width / 2
+        start = 0.0 if self.direction > 0 else self.travel
+        return (zone_center - self.dot_width / 2 - start) / (self.direction * self.speed)
+
+    def rows(self, times):
+        """(N, width) gray rows for the given times, before any look degradation."""
+        left = self.dot_left(times)[:, None]
+        on_dot = (self._cols >= left) & (self._cols < left + self.dot_width)
+        return np.where(on_dot, np.uint8(self.dot_gray), self.base_row)
+
+    def render(self, times):
+        """(N, height, width) uint8 frames for the given times, in one vectorized pass."""
+        rows = self.rows(times)
+        if self.lut is not None:
+            rows = self.lut[rows]
+        if self.blur > 0:
+            # Box blur along the bar through a cumulative sum, edges padded with their own value
+            r = self.blur
+            padded = np.pad(rows.astype(np.float32), ((0, 0), (r + 1, r)), mode="edge")
+            summed = np.cumsum(padded, axis=1)
+            rows = (summed[:, 2 * r + 1:] - summed[:, :-2 * r - 1]) / (2 * r + 1)
+        shape = (len(rows), self.height, self.width)
+        if self.noise > 0:
+            frames = rows[:, None, :] + self.rng.normal(0.0, self.noise, shape).astype(np.float32)
+            return np.clip(np.round(frames), 0, 255).astype(np.uint8)
+        frames = np.broadcast_to(rows[:, None, :], shape)
+        return np.ascontiguousarray(np.round(frames) if frames.dtype != np.uint8 else frames, dtype=np.uint8)
+
+    def chunks(self, fps, duration=None, chunk=CHUNK):
+        """Yield (frames, timestamps) batches of up to `chunk` frames sampled at `fps`."""
+        duration = self.duration if duration is None else duration
+        timestamps = np.arange(0.0, duration, 1.0 / fps)
+        for start in range(0, len(timestamps), chunk):
+            times = timestamps[start:start + chunk]
+            yield self.render(times), times
+
+def render_session(width=502, height=14, zone_start=0.7, zone_width=0.14, dot_width=0.05,
+                   speed=400.0, fps=240.0, duration=None, settings=DEFAULT_SETTINGS, **look):
+    """Render a whole bar pass as one frame stack.
+
+    `look` takes the other SyntheticBar options (direction, noise, gamma,
+    blur, scale, seed). Returns (frames, timestamps, release_time), where
+    release_time is when the dot center crosses the critical zone center.
+    """
+    bar = SyntheticBar(width, height, zone_start, zone_width, dot_width, speed, settings=settings, **look)
+    batches = list(bar.chunks(fps, duration))
+    frames = np.concatenate([frames for frames, _ in batches])
+    timestamps = np.concatenate([times for _, times in batches])
+    return frames, timestamps, bar.crossing_time()
+
+class SyntheticCapture(CaptureSource):
+    """Renders the bar live at the clock's current time instead of grabbing the screen.
+
+    Each grab() shows the bar as it is at clock.now() since the pass
+    started, so the detector can be driven at any polling rate. With `fps`
+    the picture only changes that many times a second, like a game's frame
+    rate. Like the game, a release() ends the pass; with `gap` the screen
+    stays empty for that long and then a new pass starts, which exercises
+    continuous mode. `crossings` holds the ground-truth crossing time of
+    every pass started so far.
+    """
+
+    def __init__(self, bar, clock, fps=None, gap=None):
+        super().__init__()
+        self.bar = bar
+        self.clock = clock
+        self.fps = fps
+        self.gap = gap
+        self.start = None
+        self.next_start = None
+        self.crossings = []
+        self.grabs = 0
+        self._frame = np.empty((bar.height, bar.width), dtype=np.uint8)
+        self._row = np.empty(bar.width, dtype=np.uint8)
+
+    def open(self, roi=None):
+        super().open(roi or {"x": 0, "y": 0, "width": self.bar.width, "height": self.bar.height})
+        if self.start is None and self.next_start is None:
+            self.begin_pass(self.clock.now())
+
+    def begin_pass(self, start):
+        self.start = start
+        self.next_start = None
+        self.crossings.append(start + self.bar.crossing_time())
+
+    def release(self):
+        """The mouse was let go: hide the bar and, with a gap, schedule the next pass."""
+        self.start = None
+        if self.gap is not None:
+            self.next_start = self.clock.now() + self.gap
+
+    def grab(self):
+        self.grabs += 1
+        now = self.clock.now()
+        if self.start is None:
+            if self.next_start is None or now < self.next_start:
+                self._frame.fill(0)
+                return self._frame
+            self.begin_pass(self.next_start)
+        t = now - self.start
+        if self.fps:
+            t = np.floor(t * self.fps) / self.fps
+        if not self.bar.plain:
+            return self.bar.render([t])[0]
+        left = float(self.bar.dot_left(t))
+        np.copyto(self._row, self.bar.base_row)
+        # Same columns as the batch renderer's left <= col < left + dot_width
+        self._row[int(np.ceil(left)):int(np.ceil(left + self.bar.dot_width))] = self.bar.dot_gray
+        np.copyto(self._frame, self._row)
+        return self._frame
+
+def stress(bar, cycles=5, poll_interval=None, fps=None, gap=0.2, settings=None, log_func=None):
+    """Run the real Detector in continuous mode against a live SyntheticCapture.
+
+    Uses the system clock, so polling, sleeping and the scheduler behave as
+    in the game. `settings` are applied over DEFAULT_SETTINGS, as in
+    replay(). Returns (detector, capture) once `cycles` releases have
+    happened or the detector gives up.
+    """
+    import threading
+    from clock import SystemClock
+    from config_manager import load_settings
+    from detector import Detector
+    from input_backend import RecordingInput
+
+    settings = {**DEFAULT_SETTINGS, **settings} if settings else load_settings()
+    if poll_interval:
+        settings["POLL_INTERVAL"] = poll_interval
+    clock = SystemClock()
+    capture = SyntheticCapture(bar, clock, fps=fps, gap=gap)
+    detector = None
+    done = threading.Event()
+
+    def on_event(action):
+        if action != "release":
+            return
+        capture.release()
+        if len(detector.input.times("release")) >= cycles:
+            done.set()
+            detector.stop_requested = True
+            detector.wake.set()
+
+    detector = Detector(
+        log_func=log_func or (lambda message: None),
+        continuous=True,
+        capture=capture,
+        clock=clock,
+        input_backend=RecordingInput(clock, on_event=on_event),
+        roi={"x": 0, "y": 0, "width": bar.width, "height": bar.height},
+        listen=False,
+        settings=settings,
+    )
+    capture.open()
+    detector.mouse_pressed = True
+    detector.run_cycle()
+    return detector, capture
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress the detector with a live synthetic mining bar.")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--width", type=int, default=502)
+    parser.add_argument("--height", type=int, default=14)
+    parser.add_argument("--speed", type=float, default=400.0)
+    parser.add_argument("--direction", type=int, choices=(1, -1), default=1)
+    parser.add_argument("--zone", type=float, default=0.7, help="critical zone start as a fraction of the bar")
+    parser.add_argument("--noise", type=float, default=0.0)
+    parser.add_argument("--gamma", type=float, default=1.0)
+    parser.add_argument("--blur", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--fps", type=float, help="game frame rate (default: a new picture on every grab)")
+    parser.add_argument("--poll", type=float, help="override POLL_INTERVAL")
+    args = parser.parse_args()
+
+    bar = SyntheticBar(args.width, args.height, zone_start=args.zone, speed=args.speed, direction=args.direction,
+                       noise=args.noise, gamma=args.gamma, blur=args.blur, scale=args.scale)
+    detector, capture = stress(bar, cycles=args.cycles, poll_interval=args.poll, fps=args.fps)
+    # Match each release to the nearest ground-truth crossing (the give-up release isn't a cycle)
+    releases = [c["start"] + c["time_to_trigger"] for c in detector.history.cycles if c["outcome"] == "released"]
+    truth = np.array(capture.crossings)
+    errors = [(r - truth[np.argmin(np.abs(truth - r))]) * 1000 for r in releases]
+    print(f"ROI              : {bar.width}x{bar.height} px")
+    print(f"Grabs            : {capture.grabs} ({detector.stats.fps():.0f} fps while polling)")
+    print(detector.stats.summary(detector.settings["POLL_INTERVAL"]))
+    print(detector.history.format_summary(None))
+    if errors:
+        print("Release error    : " + ", ".join(f"{e:+.2f}" for e in errors) + " ms vs ground truth")
+
+if __name__ == "__main__":
+    main()
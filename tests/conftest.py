@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app's modules import each other by bare name from mining_helper/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mining_helper"))
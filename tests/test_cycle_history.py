@@ -0,0 +1,23 @@
+from constants import DEFAULT_SETTINGS
+from cycle_history import CycleHistory
+from replay import replay
+from synthetic import render_session
+
+def test_dot_overlapping_the_zone_edge_is_a_hit():
+    history = CycleHistory()
+    history.begin(0.0)
+    history.released(0.5, 95.0, (100, 169), dot_width=25)
+    assert history.end()["hit"]
+    history.begin(1.0)
+    history.released(1.5, 80.0, (100, 169), dot_width=25)
+    assert not history.end()["hit"]
+
+def test_peak_drop_release_counts_as_a_hit():
+    frames, timestamps, _ = render_session()
+    detector = replay(frames, timestamps, settings={**DEFAULT_SETTINGS, "RELEASE_MODE": "peak_drop"})
+    cycle = detector.history.cycles[-1]
+    assert cycle["outcome"] == "released"
+    # The drop fires while the dot is still entering the zone, well before its center
+    assert cycle["offset_px"] < 0
+    assert cycle["hit"]
+    assert detector.history.summary()["hit_rate"] == 1.0
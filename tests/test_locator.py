@@ -0,0 +1,61 @@
+import numpy as np
+from constants import DEFAULT_SETTINGS
+from locator import locate_bar
+from synthetic import SyntheticBar
+
+SCREEN = (1080, 1920)
+
+def bar_rows(width=502, height=14, t=0.3):
+    return SyntheticBar(width, height).render([t])[0]
+
+def paste(screen, frame, x, y):
+    screen[y:y + frame.shape[0], x:x + frame.shape[1]] = frame
+    return {"x": x, "y": y, "width": frame.shape[1], "height": frame.shape[0]}
+
+def busy_screen(seed=0, clear=None, margin=8):
+    """Uniform gray noise with random solid blocks, including blocks in the bar grays.
+
+    Blocks of the bar's own grays touching the bar would make it genuinely
+    ambiguous, so the `clear` ROI plus `margin` is left as plain noise.
+    """
+    rng = np.random.default_rng(seed)
+    screen = rng.integers(0, 256, SCREEN, dtype=np.uint8)
+    grays = [DEFAULT_SETTINGS[key] for key in ("FILL_GRAY", "DOT_GRAY", "CRITICAL_GRAY")] + [90, 180]
+    for _ in range(40):
+        h, w = rng.integers(5, 120), rng.integers(5, 400)
+        y, x = rng.integers(0, SCREEN[0] - h), rng.integers(0, SCREEN[1] - w)
+        screen[y:y + h, x:x + w] = rng.choice(grays)
+    if clear:
+        top, left = clear["y"] - margin, clear["x"] - margin
+        bottom, right = clear["y"] + clear["height"] + margin, clear["x"] + clear["width"] + margin
+        screen[top:bottom, left:right] = rng.integers(0, 256, (bottom - top, right - left), dtype=np.uint8)
+    return screen
+
+def assert_close(found, expected, slack=2):
+    assert found is not None
+    for key in expected:
+        assert abs(found[key] - expected[key]) <= slack, (found, expected)
+
+def test_finds_the_bar_on_busy_backgrounds():
+    frame = bar_rows()
+    for seed in range(6):
+        expected = {"x": 700, "y": 800, "width": frame.shape[1], "height": frame.shape[0]}
+        screen = busy_screen(seed, clear=expected)
+        paste(screen, frame, 700, 800)
+        assert_close(locate_bar(screen, DEFAULT_SETTINGS), expected)
+
+def test_prefers_the_bar_over_a_lone_critical_strip():
+    screen = np.full(SCREEN, 20, dtype=np.uint8)
+    screen[200:215, 100:400] = 230
+    expected = paste(screen, bar_rows(), 900, 600)
+    assert_close(locate_bar(screen, DEFAULT_SETTINGS), expected)
+
+def test_rejects_screens_without_a_bar():
+    strip = np.full(SCREEN, 20, dtype=np.uint8)
+    strip[200:215, 100:400] = 230
+    fill_colored = np.full(SCREEN, 40, dtype=np.uint8)
+    fill_colored[500:515, 300:340] = 230
+    gradient = np.broadcast_to(np.linspace(0, 255, SCREEN[1]).astype(np.uint8), SCREEN).copy()
+    vertical = np.ascontiguousarray(gradient.T[:SCREEN[0], :SCREEN[0]])
+    for screen in (strip, fill_colored, gradient, vertical, busy_screen(7)):
+        assert locate_bar(screen, DEFAULT_SETTINGS) is None
@@ -0,0 +1,37 @@
+import threading
+from log_buffer import LogBuffer
+
+def test_drops_are_counted_exactly_with_many_writers():
+    logs = LogBuffer(capacity=64)
+    drained = []
+    done = threading.Event()
+
+    def write(name):
+        for i in range(5000):
+            logs.push(f"[{name}] [INFO] line {i}")
+
+    def read():
+        while not done.is_set():
+            drained.extend(logs.drain())
+        drained.extend(logs.drain())
+
+    reader = threading.Thread(target=read)
+    writers = [threading.Thread(target=write, args=(f"p{n}",)) for n in range(4)]
+    reader.start()
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    done.set()
+    reader.join()
+    assert len(drained) + logs.dropped == 20000
+    assert logs.new_drops() == logs.dropped
+    assert logs.new_drops() == 0
+
+def test_out_of_order_append_is_not_a_drop():
+    logs = LogBuffer()
+    logs.records.append((1, 0.0, "INFO", "second"))
+    logs.records.append((0, 0.0, "INFO", "first"))
+    assert len(logs.drain()) == 2
+    assert logs.dropped == 0
+    assert logs.new_drops() == 0
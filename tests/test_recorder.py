@@ -0,0 +1,51 @@
+import numpy as np
+from calibration import gray_histogram
+from recorder import FrameReader, FrameRecorder, frame_segments
+from sweep import frame_histograms
+
+def test_frames_on_both_sides_of_a_shape_change_are_kept(tmp_path):
+    path = str(tmp_path / "session.mhrec")
+    small = [np.full((4, 10), i, dtype=np.uint8) for i in range(5)]
+    large = [np.full((6, 12), 10 + i, dtype=np.uint8) for i in range(4)]
+    recorder = FrameRecorder(path, chunk_size=32)
+    # Queued before start so both sizes land in the same chunk
+    for i, frame in enumerate(small + large + small[:2]):
+        recorder.submit(frame, float(i))
+    recorder.start()
+    recorder.stop()
+    assert recorder.written == 11 and recorder.dropped == 0
+
+    reader = FrameReader(path)
+    assert len(reader) == 11
+    assert [len(segment) for segment in reader.segments] == [5, 4, 2]
+    assert reader.timestamps.tolist() == [float(i) for i in range(11)]
+    frames = [frame for _, frame in reader]
+    assert [frame.shape for frame in frames] == [(4, 10)] * 5 + [(6, 12)] * 4 + [(4, 10)] * 2
+    assert [int(frame[0, 0]) for frame in frames] == [0, 1, 2, 3, 4, 10, 11, 12, 13, 0, 1]
+    assert reader[5][1].shape == (6, 12)
+
+def test_single_size_recording_reads_as_one_array(tmp_path):
+    path = str(tmp_path / "session.mhrec")
+    recorder = FrameRecorder(path)
+    recorder.start()
+    for i in range(3):
+        recorder.submit(np.full((4, 10), i, dtype=np.uint8), float(i))
+    recorder.stop()
+    reader = FrameReader(path)
+    assert reader.frames.shape == (3, 4, 10)
+
+def test_histograms_run_over_segments_of_different_sizes(tmp_path):
+    path = str(tmp_path / "session.mhrec")
+    frames = [np.full((4, 10), i, dtype=np.uint8) for i in range(3)] + [np.full((6, 12), 50 + i, dtype=np.uint8) for i in range(2)]
+    recorder = FrameRecorder(path)
+    for i, frame in enumerate(frames):
+        recorder.submit(frame, float(i))
+    recorder.start()
+    recorder.stop()
+    reader = FrameReader(path)
+    assert [segment.shape for segment in frame_segments(reader)] == [(3, 4, 10), (2, 6, 12)]
+    assert [len(run) for run in frame_segments(reader.frames)] == [3, 2]
+
+    expected = np.array([np.bincount(frame.ravel(), minlength=256) for frame in frames])
+    assert np.array_equal(frame_histograms(reader.frames, chunk=2), expected)
+    assert np.array_equal(gray_histogram(reader.frames, chunk=2), expected.sum(axis=0))
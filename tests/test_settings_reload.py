@@ -0,0 +1,55 @@
+from clock import VirtualClock
+from constants import DEFAULT_SETTINGS
+from detector import Detector
+from input_backend import RecordingInput
+from replay import ReplayCapture
+from synthetic import render_session
+
+class EarlyCapture(ReplayCapture):
+    """Stays open between presses like the capture process, and counts its opens."""
+
+    open_early = True
+
+    def __init__(self, frames, timestamps, clock, on_grab):
+        super().__init__(frames, timestamps, clock)
+        self.on_grab = on_grab
+        self.opens = []
+
+    def open(self, roi=None):
+        super().open(roi)
+        self.opens.append(dict(self.roi))
+
+    def grab(self):
+        self.on_grab(self.grabs)
+        return super().grab()
+
+def test_sampling_change_restarts_the_capture_only_after_the_cycle():
+    frames, timestamps, _ = render_session()
+    clock = VirtualClock(start=float(timestamps[0]))
+    changed = {**DEFAULT_SETTINGS, "ROW_SAMPLES": 3}
+    detector = None
+    opens_during_cycle = []
+
+    def on_grab(grabs):
+        if grabs == 5:
+            detector.on_settings_changed(changed)
+        opens_during_cycle.append(len(detector.capture.opens))
+
+    height, width = frames[0].shape
+    detector = Detector(
+        log_func=lambda message: None,
+        capture=EarlyCapture(frames, timestamps, clock, on_grab),
+        clock=clock,
+        input_backend=RecordingInput(clock),
+        roi={"x": 0, "y": 0, "width": width, "height": height},
+        listen=False,
+        settings=DEFAULT_SETTINGS,
+    )
+    detector.open_capture()
+    detector.mouse_pressed = True
+    detector.run_cycle()
+
+    assert detector.input.times("release")
+    assert set(opens_during_cycle) == {1}
+    assert len(detector.capture.opens) == 2
+    assert detector.capture.opens[1]["height"] == 3
@@ -0,0 +1,68 @@
+import threading
+import time
+import numpy as np
+from capture import CaptureSource, SharedCapture, SliceCapture
+
+class CountingCapture(CaptureSource):
+    """Screen stand-in: every grab is a BGRA frame of its region whose first channel is x + y."""
+
+    def open(self, roi):
+        super().open(roi)
+        ys, xs = np.mgrid[roi["y"]:roi["y"] + roi["height"], roi["x"]:roi["x"] + roi["width"]]
+        self.frame = np.zeros((roi["height"], roi["width"], 4), dtype=np.uint8)
+        self.frame[..., 0] = (xs + ys) % 256
+
+    def grab(self):
+        return self.frame
+
+ROIS = [{"x": 10, "y": 20, "width": 50, "height": 4}, {"x": 100, "y": 60, "width": 30, "height": 6}, {"x": 40, "y": 90, "width": 20, "height": 2}]
+
+def test_workers_share_one_grab_per_tick():
+    shared = SharedCapture(source=CountingCapture)
+    slices = [SliceCapture(shared) for _ in ROIS]
+    for capture, roi in zip(slices, ROIS):
+        capture.configure({"POLL_INTERVAL": 0.005})
+        capture.open(roi)
+    reads = []
+
+    def poll(capture, roi):
+        for _ in range(40):
+            frame = capture.grab()
+            expected = (np.add.outer(np.arange(roi["y"], roi["y"] + roi["height"]), np.arange(roi["x"], roi["x"] + roi["width"]))) % 256
+            assert np.array_equal(frame[..., 0], expected)
+            reads.append(capture.last_timestamp)
+            time.sleep(0.005)
+
+    workers = [threading.Thread(target=poll, args=pair) for pair in zip(slices, ROIS)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    for capture in slices:
+        capture.close()
+    shared.close()
+
+    assert len(reads) == 120
+    # One grab per 5 ms tick however the three workers' polls line up
+    assert shared.grabs <= elapsed / 0.005 + 2
+    assert shared.grabs < len(reads) / 2
+
+def test_idles_while_no_slice_is_open():
+    shared = SharedCapture(source=CountingCapture)
+    capture = SliceCapture(shared)
+    capture.configure({"POLL_INTERVAL": 0.001})
+    capture.open(ROIS[0])
+    capture.grab()
+    capture.close()
+    time.sleep(0.01)
+    grabs = shared.grabs
+    time.sleep(0.05)
+    assert shared.grabs == grabs
+    capture.open(ROIS[0])
+    assert capture.grab().shape == (4, 50, 4)
+    capture.detach()
+    grabs = shared.grabs
+    time.sleep(0.02)
+    assert shared.grabs == grabs
@@ -0,0 +1,11 @@
+from constants import DEFAULT_SETTINGS
+from replay import compare
+from synthetic import render_session
+
+def test_velocity_compensated_waits_for_an_early_zone():
+    # With the zone near the start the tracker has too few samples when the dot arrives
+    frames, timestamps, release_time = render_session(zone_start=0.1)
+    result = compare(frames, timestamps, release_time, ["velocity_compensated"], repeat=1,
+                     settings=DEFAULT_SETTINGS)["velocity_compensated"]
+    assert result["hit"]
+    assert abs(result["release_error_ms"]) < 15